@@ -0,0 +1,162 @@
+"""
+Motore "batch" con NumPy: una porzione della frontiera viene espansa tutta
+insieme in un array 2-D uint8 (una riga per board) e le euristiche di tutti i
+figli sono calcolate con operazioni vettoriali invece che un nodo alla volta.
+"""
+import heapq
+import math
+import time
+
+import numpy as np
+
+from homework_main import (PuzzleState, get_goal_state, manhattan_table, move_table,
+                           linear_conflict_table, TIMEOUT_CHECK_INTERVAL)
+
+
+class BatchTables:
+    """Tabelle NumPy precalcolate per una dimensione della griglia."""
+    def __init__(self, size):
+        n = size * size
+        self.size = size
+        self.n = n
+        self.manhattan = np.array(manhattan_table(size), dtype=np.int16)
+        self.linear_conflict = np.frombuffer(bytes(linear_conflict_table(size)), dtype=np.uint8).astype(np.int16)
+
+        # Cifra di ogni tessera nel codice di riga / colonna, per ogni linea
+        tiles = np.arange(n)
+        goal_row = np.where(tiles > 0, (tiles - 1) // size, -1)
+        goal_col = np.where(tiles > 0, (tiles - 1) % size, -1)
+        lines = np.arange(size)[:, None]
+        self.row_digit = np.where(goal_row[None, :] == lines, goal_col[None, :] + 1, 0)  # [linea, tessera]
+        self.col_digit = np.where(goal_col[None, :] == lines, goal_row[None, :] + 1, 0)
+        self.powers = (size + 1) ** np.arange(size)
+
+        # targets[pos, k] = k-esima casella adiacente a pos (-1 se non esiste)
+        targets = np.full((n, 4), -1, dtype=np.int64)
+        for pos, adj in enumerate(move_table(size)):
+            targets[pos, :len(adj)] = adj
+        self.targets = targets
+
+
+_BATCH_TABLES = {}
+
+def batch_tables(size):
+    tables = _BATCH_TABLES.get(size)
+    if tables is None:
+        tables = _BATCH_TABLES[size] = BatchTables(size)
+    return tables
+
+
+def batch_manhattan(boards, size):
+    """Distanza di Manhattan di ogni riga di 'boards' (array B x n di uint8)."""
+    t = batch_tables(size)
+    return t.manhattan[boards, np.arange(t.n)].sum(axis=1)
+
+def batch_linear_conflict(boards, size):
+    """Manhattan + conflitti lineari di ogni riga di 'boards'."""
+    t = batch_tables(size)
+    grid = boards.reshape(-1, size, size)
+    lines = np.arange(size)[None, :, None]
+    # Codici di riga: grid[b, r, p]; codici di colonna: grid trasposta [b, c, p]
+    row_codes = (t.row_digit[lines, grid] * t.powers).sum(axis=2)
+    col_codes = (t.col_digit[lines, grid.transpose(0, 2, 1)] * t.powers).sum(axis=2)
+    conflicts = t.linear_conflict[row_codes].sum(axis=1) + t.linear_conflict[col_codes].sum(axis=1)
+    return batch_manhattan(boards, size) + conflicts
+
+BATCH_HEURISTICS = {"manhattan": batch_manhattan, "linear_conflict": batch_linear_conflict}
+
+
+def expand_batch(boards, size):
+    """
+    Genera tutti i figli di un blocco di board in un colpo solo.
+    Restituisce (children, parent_idx): array dei figli e indice del padre.
+    """
+    t = batch_tables(size)
+    blanks = np.argmin(boards, axis=1)  # il vuoto è l'unico 0
+    all_children = []
+    all_parents = []
+    for k in range(4):
+        targets = t.targets[blanks, k]
+        valid = np.nonzero(targets >= 0)[0]
+        if not len(valid):
+            continue
+        children = boards[valid].copy()
+        rows = np.arange(len(valid))
+        dest = targets[valid]
+        src = blanks[valid]
+        children[rows, src] = children[rows, dest]
+        children[rows, dest] = 0
+        all_children.append(children)
+        all_parents.append(valid)
+    return np.concatenate(all_children), np.concatenate(all_parents)
+
+
+def solve_batched_astar(start_state, timeout=60, batch_size=512, heuristic="linear_conflict"):
+    """
+    A* a blocchi: a ogni passo si estraggono fino a 'batch_size' nodi con lo
+    stesso f minimo (A* li espanderebbe comunque tutti, in qualche ordine), si
+    espandono insieme con expand_batch e si valutano i figli con l'euristica
+    vettoriale. I nodi riaperti con g migliore vengono rimessi in coda, quindi
+    la soluzione resta ottima con qualsiasi euristica ammissibile.
+    Restituisce lo stesso dizionario di solve_astar.
+    """
+    size = start_state.size
+    n = size * size
+    evaluate = BATCH_HEURISTICS[heuristic]
+    goal_key = bytes(get_goal_state(size).board)
+
+    start_key = bytes(start_state.board)
+    start_h = int(evaluate(np.frombuffer(start_key, dtype=np.uint8).reshape(1, n), size)[0])
+    open_list = [(start_h, 0, 0, start_key)]
+    g_score = {start_key: 0}
+    came_from = {start_key: None}
+    count = 0
+    nodes_expanded = 0
+    batches = 0
+    start_time = time.time()
+
+    while open_list:
+        batches += 1
+        if batches % (TIMEOUT_CHECK_INTERVAL // 64) == 0 and time.time() - start_time > timeout:
+            return {"status": "timeout", "time": timeout, "nodes_expanded": nodes_expanded}
+
+        # Estrazione del blocco: tutti nodi con f = fmin (scartando gli obsoleti)
+        keys = []
+        gs = []
+        f_min = open_list[0][0]
+        while open_list and open_list[0][0] == f_min and len(keys) < batch_size:
+            _, g, _, key = heapq.heappop(open_list)
+            if g > g_score[key]:
+                continue
+            if key == goal_key:
+                path = []
+                while key is not None:
+                    path.append(PuzzleState(tuple(key), size))
+                    key = came_from[key]
+                return {
+                    "status": "success",
+                    "path": path[::-1],
+                    "nodes_expanded": nodes_expanded,
+                    "time": time.time() - start_time
+                }
+            keys.append(key)
+            gs.append(g)
+        if not keys:
+            continue
+        nodes_expanded += len(keys)
+
+        parents = np.frombuffer(b"".join(keys), dtype=np.uint8).reshape(len(keys), n)
+        children, parent_idx = expand_batch(parents, size)
+        h_values = evaluate(children, size).tolist()
+        blob = children.tobytes()
+
+        for i, p in enumerate(parent_idx.tolist()):
+            key = blob[i * n:(i + 1) * n]
+            g = gs[p] + 1
+            if g < g_score.get(key, math.inf):
+                g_score[key] = g
+                came_from[key] = keys[p]
+                count += 1
+                heapq.heappush(open_list, (g + h_values[i], g, count, key))
+
+    return {"status": "failure"}
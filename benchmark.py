@@ -1,9 +1,17 @@
 import time
-import csv
 import os
+import random
+import argparse
+import resource
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 # Importa le funzioni dal tuo file principale (assumendo si chiami homework_main.py)
 # Se il tuo file ha un altro nome, cambia l'import qui sotto
-from homework_main import PuzzleState, solve_astar, generate_pddl, run_planner_and_parse, generate_random_instance
+from homework_main import solve_astar, generate_pddl, generate_random_instance, solve_with_planner
+from solution_cache import SolutionCache
+from homework_main import planner_workdir, shared_domain_file, clear_pddl_cache, solve_bidirectional, SearchStats
+from homework_main import solve_anytime_astar
+from results_store import ResultStore
 
 # --- CONFIGURAZIONE ---
 PLANNER_PATH = "/home/sam/Desktop/AI/HomeWork/Code/fast-downward/fast-downward.py"
@@ -26,69 +34,440 @@ EXPERIMENTS = [
 
 NUM_RUNS = 3 # Quante volte ripetere ogni configurazione per fare la media
 
-def run_benchmark():
-    # Prepariamo il file CSV
-    with open(OUTPUT_CSV, "w", newline="") as csvfile:
-        writer = csv.writer(csvfile)
-        # Intestazione colonne
-        writer.writerow([
-            "N", "Shuffle_Steps", "Run_ID", 
-            "A*_Status", "A*_Time", "A*_Nodes", "A*_Len",
-            "Planner_Status", "Planner_Time", "Planner_Nodes", "Planner_Len"
-        ])
-        
-        print(f"Inizio benchmark. I risultati saranno salvati in {OUTPUT_CSV}")
+# Colonne del CSV dei risultati (i contatori di SearchStats finiscono in coda come A*_<nome>,
+# seguiti dalle colonne di ARA*, eseguito solo quando A* va in timeout, e da Cached:
+# 1 se l'istanza era già nella cache delle soluzioni e nessun solver è stato eseguito)
+CSV_HEADER = [
+    "N", "Shuffle_Steps", "Run_ID",
+    "A*_Status", "A*_Time", "A*_Nodes", "A*_Len",
+    "Planner_Status", "Planner_Time", "Planner_Nodes", "Planner_Len"
+] + [f"A*_{name}" for name in SearchStats.__slots__] + [
+    "ARA*_Status", "ARA*_First_Time", "ARA*_First_Len", "ARA*_Best_Len", "ARA*_Bound", "ARA*_Curve",
+    "Cached"
+]
+
+def anytime_columns(res):
+    """
+    Colonne ARA* del CSV. ARA*_Curve è la curva di qualità: una voce
+    "tempo:lunghezza:limite" per ogni soluzione migliorata, separate da ';'.
+    """
+    solutions = res.get("solutions", [])
+    if not solutions:
+        return [res["status"], "", "", "", "", ""]
+    first, best = solutions[0], solutions[-1]
+    curve = ";".join(f"{s['time']:.3f}:{s['length']}:{s['bound']:.3f}" for s in solutions)
+    status = "optimal" if res["optimal"] else "bounded"
+    return [status, f"{first['time']:.4f}", first["length"], best["length"], f"{best['bound']:.3f}", curve]
+
+def run_cell(N, steps, run_id, planner_path=PLANNER_PATH, astar_timeout=120, planner_timeout=None, verbose=True,
+             cache=None, generator="walk", instrument=False, ara_timeout=None):
+    """
+    Esegue una singola cella (N, steps, run_id): A* + Planner. Restituisce la riga del CSV.
+    Con 'cache' (SolutionCache) un'istanza già risolta non viene cercata di nuovo: la riga
+    ha Cached=1, le lunghezze della cache e tempi e nodi vuoti (che quindi vengono sempre da
+    una ricerca vera). Altrimenti entrambi i solver girano e le soluzioni trovate vengono salvate.
+    'generator' è il mode di generate_random_instance ("walk" o "uniform").
+    Con instrument=True A* riempie le colonne A*_<contatore> di SearchStats: i tempi
+    per nodo rallentano la ricerca (fino a un terzo), quindi A*_Time non è più
+    confrontabile con il planner. Senza, quelle colonne restano vuote.
+    Se A* va in timeout, ARA* riparte con un budget proprio di 'ara_timeout'
+    secondi (default: astar_timeout, 0 lo disattiva): nel caso peggiore la parte
+    A* della cella dura astar_timeout + ara_timeout.
+    """
+    # 1. Genera Istanza
+    start_node = generate_random_instance(N, steps, mode=generator)
+
+    cached_moves = cache.lookup(start_node) if cache is not None else None
+    if cached_moves is not None:
+        if verbose:
+            print(" in cache, salto")
+        length = len(cached_moves)
+        return ([N, steps, run_id, "cached", "", "", length, "cached", "", "", length]
+                + [""] * len(SearchStats.__slots__) + ["skipped", "", "", "", "", "", 1])
+    
+    # 2. Esegui A* (Python)
+    # Nota: A* in Python puri su 15-puzzle complessi può metterci minuti.
+    stats = SearchStats() if instrument else None
+    astar_res = solve_astar(start_node, timeout=astar_timeout, stats=stats)
+    if cache is not None and astar_res['status'] == 'success':
+        cache.store(astar_res['path'])
+    
+    # Normalizziamo lunghezza A* (sottraiamo 1 per contare le mosse, non gli stati)
+    astar_len = len(astar_res['path']) - 1 if astar_res['status'] == 'success' else 0
+    
+    if verbose:
+        print(f" A* done ({astar_res.get('time', 0):.4f}s) |", end="", flush=True)
+
+    # 2b. A* ottimo in timeout: ARA* (con il suo budget) registra almeno soluzioni con limite
+    if ara_timeout is None:
+        ara_timeout = astar_timeout
+    if astar_res['status'] == 'timeout' and ara_timeout > 0:
+        ara_columns = anytime_columns(solve_anytime_astar(start_node, timeout=ara_timeout))
+        if verbose:
+            print(f" ARA* done ({ara_columns[0]}, len {ara_columns[3]}) |", end="", flush=True)
+    else:
+        ara_columns = ["skipped", "", "", "", "", ""]
+    
+    # 3. Esegui Planner (PDDL e sas_plan in una cartella temporanea privata, rimossa alla fine)
+    # Nota: Usiamo un alias veloce ma ottimale
+    # Se il tuo planner fallisce spesso, prova a cambiare l'argomento search dentro run_planner_and_parse
+    # Il planner gira comunque: la cache non gli fornisce la soluzione appena trovata da A*
+    plan_res = solve_with_planner(start_node, planner_path=planner_path, timeout=planner_timeout)
+    
+    if verbose:
+        print(f" Planner done ({plan_res.get('time', 0)}s)")
+    
+    return [
+        N, steps, run_id,
+        astar_res['status'], 
+        f"{astar_res.get('time', 0):.4f}", 
+        astar_res.get('nodes_expanded', 0), 
+        astar_len,
+        plan_res['status'], 
+        plan_res.get('time', 0), 
+        plan_res.get('expanded_nodes', 0), 
+        plan_res.get('plan_length', 0)
+    ] + stats_columns(stats) + ara_columns + [0]
+
+def stats_columns(stats):
+    """Colonne A*_<contatore> del CSV (vuote senza strumentazione)."""
+    if stats is None:
+        return [""] * len(SearchStats.__slots__)
+    return [round(value, 4) if isinstance(value, float) else value for value in stats.as_dict().values()]
+
+def run_config(mode, generator, **extra):
+    """Configurazione del run salvata nel manifest dei risultati."""
+    return dict({"mode": mode, "experiments": EXPERIMENTS, "num_runs": NUM_RUNS, "generator": generator}, **extra)
+
+def run_benchmark(cache_path=None, generator="walk", resume=True, instrument=False, ara_timeout=None):
+    cache = SolutionCache(cache_path) if cache_path else None
+    # Ogni riga viene scritta su disco appena pronta; con resume le celle già nel CSV vengono saltate
+    store = ResultStore(OUTPUT_CSV, CSV_HEADER,
+                        config=run_config("sweep", generator, instrument=instrument, ara_timeout=ara_timeout),
+                        resume=resume)
+    completed = store.completed()
+    
+    print(f"Inizio benchmark. I risultati saranno salvati in {OUTPUT_CSV}")
+    if completed:
+        print(f"Ripresa: {len(completed)} celle già completate")
+    
+    for N, steps in EXPERIMENTS:
+        print(f"\n--- Testing N={N}, Shuffle={steps} ---")
         
-        for N, steps in EXPERIMENTS:
-            print(f"\n--- Testing N={N}, Shuffle={steps} ---")
+        for run_id in range(1, NUM_RUNS + 1):
+            if (str(N), str(steps), str(run_id)) in completed:
+                print(f"  Run {run_id}/{NUM_RUNS} già nel CSV, salto")
+                continue
+            print(f"  Run {run_id}/{NUM_RUNS}...", end="", flush=True)
             
-            for run_id in range(1, NUM_RUNS + 1):
-                print(f"  Run {run_id}/{NUM_RUNS}...", end="", flush=True)
-                
-                # 1. Genera Istanza
-                start_node = generate_random_instance(N, steps)
-                
-                # 2. Esegui A* (Python)
-                # Nota: A* in Python puri su 15-puzzle complessi può metterci minuti.
-                astar_res = solve_astar(start_node, timeout=120) 
-                
-                # Gestisci il caso di timeout per la lunghezza
-                if astar_res['status'] == 'success':
-                    astar_len = len(astar_res['path']) - 1
-                else:
-                    astar_len = 0 # O -1 per indicare fallimento
-                
-                # Normalizziamo lunghezza A* (sottraiamo 1 per contare le mosse, non gli stati)
-                astar_len = len(astar_res['path']) - 1 if astar_res['status'] == 'success' else 0
-                
-                print(f" A* done ({astar_res['time']:.4f}s) |", end="", flush=True)
-                
-                # 3. Esegui Planner
-                dom, prob = generate_pddl(start_node)
-                # Nota: Usiamo un alias veloce ma ottimale
-                # Se il tuo planner fallisce spesso, prova a cambiare l'argomento search dentro run_planner_and_parse
-                plan_res = run_planner_and_parse(dom, prob, planner_path=PLANNER_PATH)
-                
-                print(f" Planner done ({plan_res.get('time', 0)}s)")
-                
-                # 4. Salva riga nel CSV
-                writer.writerow([
-                    N, steps, run_id,
-                    astar_res['status'], 
-                    f"{astar_res['time']:.4f}", 
-                    astar_res.get('nodes_expanded', 0), 
-                    astar_len,
-                    plan_res['status'], 
-                    plan_res.get('time', 0), 
-                    plan_res.get('expanded_nodes', 0), 
-                    plan_res.get('plan_length', 0)
-                ])
-                
-                # Pulizia file PDDL generati
-                if os.path.exists(dom): os.remove(dom)
-                if os.path.exists(prob): os.remove(prob)
+            # 4. Salva riga nel CSV
+            store.append(run_cell(N, steps, run_id, PLANNER_PATH, cache=cache, generator=generator,
+                                  instrument=instrument, ara_timeout=ara_timeout))
 
+    store.close()
     print(f"\nBenchmark completato! Apri {OUTPUT_CSV} per vedere i dati.")
 
+# --- Benchmark parallelo ---
+
+# Id del worker corrente (assegnato da _init_worker in ogni processo del pool)
+_WORKER_ID = None
+# Cache delle soluzioni aperta dal worker (ogni processo ha la sua connessione SQLite)
+_WORKER_CACHE = None
+
+def _init_worker(counter, memory_limit_mb, cache_path=None):
+    global _WORKER_ID, _WORKER_CACHE
+    with counter.get_lock():
+        counter.value += 1
+        _WORKER_ID = counter.value
+    if cache_path:
+        _WORKER_CACHE = SolutionCache(cache_path)
+    # Dopo il fork tutti i worker avrebbero lo stesso stato del generatore casuale
+    random.seed()
+    if memory_limit_mb:
+        # Il limite vale anche per i sottoprocessi del planner lanciati dal worker
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def _run_cell_in_worker(N, steps, run_id, planner_path, task_timeout, generator="walk", instrument=False,
+                        ara_timeout=None):
+    try:
+        row = run_cell(N, steps, run_id, planner_path, astar_timeout=task_timeout,
+                       planner_timeout=task_timeout, verbose=False, cache=_WORKER_CACHE, generator=generator,
+                       instrument=instrument, ara_timeout=ara_timeout)
+    except MemoryError:
+        row = ([N, steps, run_id, "memory", 0, 0, 0, "skipped", 0, 0, 0] + stats_columns(None)
+               + ["skipped", "", "", "", "", "", 0])
+    return row + [_WORKER_ID]
+
+def run_benchmark_parallel(workers=None, task_timeout=120, memory_limit_mb=None, cache_path=None, generator="walk",
+                           resume=True, instrument=False, ara_timeout=None):
+    """
+    Come run_benchmark, ma le celle (N, steps, run_id) vengono distribuite su
+    un ProcessPoolExecutor. Le righe vengono scritte nel CSV man mano che le
+    celle terminano (ordine di completamento) con la colonna Worker_ID.
+    """
+    workers = workers or os.cpu_count()
+    counter = multiprocessing.Value("i", 0)
+    store = ResultStore(OUTPUT_CSV, CSV_HEADER + ["Worker_ID"], resume=resume,
+                        config=run_config("parallel", generator, workers=workers, task_timeout=task_timeout,
+                                          instrument=instrument, ara_timeout=ara_timeout))
+    completed = store.completed()
+    cells = [(N, steps, run_id) for N, steps in EXPERIMENTS for run_id in range(1, NUM_RUNS + 1)
+             if (str(N), str(steps), str(run_id)) not in completed]
+    planner_path = os.path.abspath(PLANNER_PATH)
+    
+    print(f"Inizio benchmark parallelo ({workers} worker, {len(cells)} celle). Risultati in {OUTPUT_CSV}")
+    if completed:
+        print(f"Ripresa: {len(completed)} celle già completate")
+    start_time = time.time()
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(counter, memory_limit_mb, cache_path)) as pool:
+        futures = [pool.submit(_run_cell_in_worker, N, steps, run_id, planner_path, task_timeout, generator,
+                               instrument, ara_timeout)
+                   for N, steps, run_id in cells]
+        for done, future in enumerate(as_completed(futures), 1):
+            row = future.result()
+            store.append(row)
+            print(f"  [{done}/{len(cells)}] N={row[0]} Shuffle={row[1]} Run={row[2]} "
+                  f"A*={row[3]} Planner={row[7]} (worker {row[-1]})")
+    
+    store.close()
+    print(f"\nBenchmark completato in {time.time() - start_time:.1f}s! Apri {OUTPUT_CSV} per vedere i dati.")
+
+def run_throughput_benchmark(sizes=(4, 5), timeout=30, seed=0):
+    """
+    Confronta il throughput di A* (nodi espansi al secondo) con euristica
+    ricalcolata da zero e con euristica incrementale, sulle righe di
+    EXPERIMENTS con N in 'sizes'. Stessa istanza per entrambe le varianti.
+    """
+    random.seed(seed)
+    print(f"{'N':>2} {'Steps':>5} {'Nodi':>8} {'Full (n/s)':>12} {'Incr (n/s)':>12} {'Speedup':>8}")
+    for N, steps in EXPERIMENTS:
+        if N not in sizes:
+            continue
+        start_node = generate_random_instance(N, steps)
+        rates = []
+        for incremental in (False, True):
+            res = solve_astar(start_node, timeout=timeout, incremental_h=incremental)
+            rates.append(res['nodes_expanded'] / max(res['time'], 1e-9))
+        print(f"{N:>2} {steps:>5} {res['nodes_expanded']:>8} {rates[0]:>12.0f} {rates[1]:>12.0f} {rates[1] / rates[0]:>7.2f}x")
+
+def run_open_list_benchmark(timeout=30, seed=0):
+    """
+    Confronta le open list di solve_astar ("heap" e "bucket") sulla griglia
+    EXPERIMENTS: push, pop obsoleti, picco della open list e tempo.
+    """
+    random.seed(seed)
+    print(f"{'N':>2} {'Steps':>5} {'Open':>6} {'Status':>8} {'Nodi':>8} {'Push':>8} {'Stale':>7} {'Peak':>8} {'Tempo':>8}")
+    for N, steps in EXPERIMENTS:
+        start_node = generate_random_instance(N, steps)
+        for kind in ("heap", "bucket"):
+            res = solve_astar(start_node, timeout=timeout, open_list=kind)
+            print(f"{N:>2} {steps:>5} {kind:>6} {res['status']:>8} {res['nodes_expanded']:>8} {res['pushes']:>8} "
+                  f"{res['stale_pops']:>7} {res['peak_open']:>8} {res['time']:>8.3f}")
+
+def run_bidirectional_benchmark(timeout=30, seed=0):
+    """
+    Confronta A* unidirezionale e solve_bidirectional sulle righe di
+    EXPERIMENTS, riportando i nodi espansi in avanti e all'indietro.
+    """
+    random.seed(seed)
+    print(f"{'N':>2} {'Steps':>5} {'A* stato':>9} {'A* nodi':>9} {'A* t':>8} "
+          f"{'Bi stato':>9} {'Avanti':>9} {'Indietro':>9} {'Bi t':>8}")
+    for N, steps in EXPERIMENTS:
+        start_node = generate_random_instance(N, steps)
+        uni = solve_astar(start_node, timeout=timeout)
+        bi = solve_bidirectional(start_node, timeout=timeout)
+        print(f"{N:>2} {steps:>5} {uni['status']:>9} {uni['nodes_expanded']:>9} {uni['time']:>8.3f} "
+              f"{bi['status']:>9} {bi['nodes_expanded_forward']:>9} {bi['nodes_expanded_backward']:>9} {bi['time']:>8.3f}")
+
+def run_batch_benchmark(sizes=(5, 6), timeout=30, seed=0):
+    """
+    Throughput (nodi/s) di solve_astar contro l'A* a blocchi NumPy di
+    batch_search sulle righe di EXPERIMENTS con N in 'sizes'.
+    """
+    # NumPy serve solo per questa modalità
+    from batch_search import solve_batched_astar
+
+    random.seed(seed)
+    print(f"{'N':>2} {'Steps':>5} {'A* stato':>9} {'A* n/s':>9} {'Batch stato':>12} {'Batch n/s':>10} {'Speedup':>8}")
+    for N, steps in EXPERIMENTS:
+        if N not in sizes:
+            continue
+        start_node = generate_random_instance(N, steps)
+        res = solve_astar(start_node, timeout=timeout)
+        batch = solve_batched_astar(start_node, timeout=timeout)
+        rate = res['nodes_expanded'] / max(res['time'], 1e-9)
+        batch_rate = batch['nodes_expanded'] / max(batch['time'], 1e-9)
+        print(f"{N:>2} {steps:>5} {res['status']:>9} {rate:>9.0f} {batch['status']:>12} {batch_rate:>10.0f} "
+              f"{batch_rate / max(rate, 1e-9):>7.2f}x")
+
+def run_hda_benchmark(max_workers=None, timeout=120, seed=0, experiments=((4, 50), (4, 60), (5, 60))):
+    """
+    Curva di speedup di HDA* (parallel_search) da 1 a max_workers processi:
+    per ogni istanza tempo, speedup rispetto a 1 processo ed espansioni per worker.
+    """
+    from parallel_search import solve_hda_star
+
+    max_workers = max_workers or os.cpu_count()
+    random.seed(seed)
+    print(f"{'N':>2} {'Steps':>5} {'Proc':>4} {'Stato':>8} {'Len':>4} {'Nodi':>9} {'Tempo':>8} {'Speedup':>8}  Espansi per worker")
+    for N, steps in experiments:
+        start_node = generate_random_instance(N, steps)
+        base_time = None
+        for workers in range(1, max_workers + 1):
+            res = solve_hda_star(start_node, timeout=timeout, workers=workers)
+            length = len(res['path']) - 1 if res['status'] == 'success' else 0
+            if base_time is None:
+                base_time = res['time']
+            print(f"{N:>2} {steps:>5} {workers:>4} {res['status']:>8} {length:>4} {res['nodes_expanded']:>9} "
+                  f"{res['time']:>8.3f} {base_time / max(res['time'], 1e-9):>7.2f}x  {res['expanded_per_worker']}")
+
+def run_heuristic_benchmark(names=("linear_conflict", "walking_distance"), timeout=60, seed=0):
+    """
+    Per ogni euristica del registro (heuristics.py): tempo di costruzione o
+    caricamento da disco e dimensione delle tabelle per ogni N, poi nodi
+    espansi da solve_astar rispetto a Manhattan sulle righe di EXPERIMENTS.
+    """
+    from heuristics import get_heuristic
+
+    sizes = sorted({N for N, _ in EXPERIMENTS})
+    loaded = {}
+    print(f"{'Euristica':<18} {'N':>2} {'Origine':>8} {'Tempo':>9} {'Tabella':>12}")
+    for name in names:
+        for N in sizes:
+            try:
+                heuristic = loaded[name, N] = get_heuristic(name, N)
+            except ValueError as e:
+                print(f"{name:<18} {N:>2} {'n/d':>8}  ({e})")
+                continue
+            origin = "disco" if heuristic.from_disk else "build"
+            print(f"{name:<18} {N:>2} {origin:>8} {heuristic.build_time:>8.3f}s {heuristic.table_bytes():>10} B")
+
+    random.seed(seed)
+    print(f"\n{'N':>2} {'Steps':>5} {'Manhattan':>10} " + " ".join(f"{name:>24}" for name in names))
+    for N, steps in EXPERIMENTS:
+        start_node = generate_random_instance(N, steps)
+        base = solve_astar(start_node, timeout=timeout)
+        base_nodes = base['nodes_expanded'] if base['status'] == 'success' else None
+        cells = []
+        for name in names:
+            if (name, N) not in loaded:
+                cells.append(f"{'n/d':>24}")
+                continue
+            res = solve_astar(start_node, timeout=timeout, heuristic=loaded[name, N])
+            if res['status'] != 'success':
+                cells.append(f"{res['status']:>24}")
+            elif base_nodes:
+                cells.append(f"{res['nodes_expanded']:>12} ({res['nodes_expanded'] / base_nodes - 1:>+8.1%})")
+            else:
+                cells.append(f"{res['nodes_expanded']:>24}")
+        base_cell = base['nodes_expanded'] if base_nodes is not None else base['status']
+        print(f"{N:>2} {steps:>5} {base_cell:>10} " + " ".join(cells))
+
+def run_pruning_benchmark(sizes=((4, 60), (5, 60)), instances=5, tt_bits=20, timeout=60, seed=0):
+    """
+    IDA* semplice (solo divieto di tornare indietro), con l'automa delle mosse,
+    con la tabella delle trasposizioni e con entrambi (transposition.py), con
+    e senza la chiave simmetrica per trasposizione, su random walk di 4x4 e
+    5x5: nodi generati, tempo e lunghezza (deve restare quella ottima di IDA*
+    semplice).
+    """
+    from transposition import move_fsm, solve_idastar_pruned
+
+    fsm = move_fsm()
+    print(f"Automa: {len(fsm.forbidden)} sequenze vietate, {len(fsm)} stati, costruito in {fsm.build_time:.2f}s")
+    variants = [("plain", False, 0, False), ("fsm", True, 0, False), ("tt", False, tt_bits, False),
+                ("fsm+tt", True, tt_bits, False), ("fsm+tt+sym", True, tt_bits, True)]
+    random.seed(seed)
+    print(f"{'N':>2} {'Steps':>5} {'#':>2} " + " ".join(f"{name:>24}" for name, *_ in variants))
+    for N, steps in sizes:
+        for i in range(instances):
+            start_node = generate_random_instance(N, steps)
+            cells = []
+            base_nodes = base_length = None
+            for name, use_fsm, bits, symmetry in variants:
+                res = solve_idastar_pruned(start_node, timeout=timeout, fsm=use_fsm, tt_bits=bits, symmetry=symmetry)
+                if res['status'] != 'success':
+                    cells.append(f"{res['status']:>24}")
+                    continue
+                generated = res['nodes_generated']
+                length = len(res['path']) - 1
+                if base_nodes is None:
+                    base_nodes, base_length = generated, length
+                elif length != base_length:
+                    raise RuntimeError(f"{name}: soluzione di {length} mosse invece di {base_length}")
+                cells.append(f"{generated:>11} {generated / base_nodes - 1:>+6.1%} {res['time']:>5.2f}s")
+            print(f"{N:>2} {steps:>5} {i:>2} " + " ".join(cells))
+
+def run_pddl_benchmark(sizes=(3, 4, 5, 6, 8, 10), instances=200):
+    """
+    Micro-benchmark della generazione PDDL al variare di N: tempo della prima
+    chiamata (costruzione dei blocchi statici) e tempo medio per istanza
+    successiva, scrivendo in una cartella temporanea.
+    """
+    print(f"{'N':>3} {'Prima (ms)':>11} {'Media (ms)':>11} {'Byte problem':>13}")
+    with planner_workdir() as work_dir:
+        domain_file = shared_domain_file()
+        for N in sizes:
+            states = [generate_random_instance(N, 50) for _ in range(instances)]
+            clear_pddl_cache(N)
+
+            t0 = time.perf_counter()
+            _, prob = generate_pddl(states[0], out_dir=work_dir, domain_file=domain_file)
+            first = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            for state in states[1:]:
+                generate_pddl(state, out_dir=work_dir, domain_file=domain_file)
+            avg = (time.perf_counter() - t0) / (instances - 1)
+            print(f"{N:>3} {first * 1000:>11.3f} {avg * 1000:>11.3f} {os.path.getsize(prob):>13}")
+
 if __name__ == "__main__":
-    run_benchmark()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Benchmark A* vs Planner sul N-Puzzle")
+    parser.add_argument("mode", nargs="?", default="sweep", choices=["sweep", "parallel", "throughput", "openlist", "pddl", "bidir", "batch", "hda", "heuristics", "pruning"],
+                        help="sweep: benchmark completo su CSV; parallel: come sweep su più processi; "
+                             "throughput: euristica incrementale vs completa; openlist: heap vs bucket; "
+                             "pddl: tempo di generazione PDDL al variare di N; bidir: A* vs A* bidirezionale; "
+                             "batch: A* vs A* a blocchi NumPy; hda: speedup di HDA* da 1 a --workers processi; "
+                             "heuristics: tabelle e nodi espansi delle euristiche rispetto a Manhattan; "
+                             "pruning: IDA* con automa delle mosse e tabella delle trasposizioni")
+    parser.add_argument("--workers", type=int, default=None, help="Numero di processi (default: tutti i core)")
+    parser.add_argument("--task-timeout", type=float, default=120, help="Timeout (s) di A* e del planner per cella")
+    parser.add_argument("--memory-mb", type=int, default=None, help="Limite di memoria per worker (MB)")
+    parser.add_argument("--cache", default=None, help="File SQLite della cache delle soluzioni (sweep/parallel)")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Ricomincia il CSV invece di riprendere le celle già completate (sweep/parallel)")
+    parser.add_argument("--generator", default="walk", choices=["walk", "uniform"],
+                        help="Istanze: random walk senza ritorni di Shuffle_Steps mosse o permutazioni uniformi")
+    parser.add_argument("--ara-timeout", type=float, default=None,
+                        help="Budget (s) di ARA* dopo un timeout di A* (default: come A*, quindi la cella può "
+                             "durare il doppio; 0 disattiva ARA*)")
+    parser.add_argument("--instrument", action="store_true",
+                        help="Riempie le colonne A*_<contatore> con SearchStats (sweep/parallel); rallenta A*, "
+                             "quindi A*_Time non va confrontato con il planner")
+    args = parser.parse_args()
+
+    if args.mode == "throughput":
+        run_throughput_benchmark()
+    elif args.mode == "openlist":
+        run_open_list_benchmark()
+    elif args.mode == "bidir":
+        run_bidirectional_benchmark()
+    elif args.mode == "batch":
+        run_batch_benchmark()
+    elif args.mode == "heuristics":
+        run_heuristic_benchmark(timeout=args.task_timeout)
+    elif args.mode == "pruning":
+        run_pruning_benchmark(timeout=args.task_timeout)
+    elif args.mode == "hda":
+        run_hda_benchmark(args.workers, args.task_timeout)
+    elif args.mode == "pddl":
+        run_pddl_benchmark()
+    elif args.mode == "parallel":
+        run_benchmark_parallel(args.workers, args.task_timeout, args.memory_mb, args.cache, args.generator,
+                               resume=not args.fresh, instrument=args.instrument, ara_timeout=args.ara_timeout)
+    else:
+        run_benchmark(args.cache, args.generator, resume=not args.fresh, instrument=args.instrument,
+                      ara_timeout=args.ara_timeout)
\ No newline at end of file
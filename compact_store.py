@@ -0,0 +1,241 @@
+"""
+Store compatto degli stati visitati per A*: ogni board viene ridotta al suo
+rango di permutazione (Myrvold-Ruskey, O(n)) e il padre viene ricordato solo
+come codice a 2 bit della mossa del vuoto, in una hash table ad indirizzamento
+aperto sopra array piatti (array / bytearray) invece di dizionari di oggetti.
+"""
+import math
+import time
+import heapq
+from array import array
+
+from homework_main import (get_goal_state, manhattan_table, move_table, heuristic_manhattan,
+                           replay_blank_moves, _BoardView, TIMEOUT_CHECK_INTERVAL)
+
+
+# --- Ranking delle permutazioni (Myrvold & Ruskey) ---
+
+def rank_permutation(board):
+    """Rango (0 .. n!-1) della permutazione 'board' in tempo O(n)."""
+    n = len(board)
+    perm = list(board)
+    inv = [0] * n
+    for i, val in enumerate(perm):
+        inv[val] = i
+    rank = 0
+    mult = 1
+    for k in range(n, 1, -1):
+        s = perm[k - 1]
+        j = inv[k - 1]
+        perm[k - 1], perm[j] = perm[j], perm[k - 1]
+        inv[s], inv[k - 1] = inv[k - 1], inv[s]
+        rank += s * mult
+        mult *= k
+    return rank
+
+def unrank_permutation(rank, n):
+    """Operazione inversa di rank_permutation: restituisce la board come lista."""
+    perm = list(range(n))
+    for k in range(n, 0, -1):
+        rank, r = divmod(rank, k)
+        perm[k - 1], perm[r] = perm[r], perm[k - 1]
+    return perm
+
+
+# --- Hash table compatta ---
+
+# Byte di metadati per slot: bit 0-1 mossa del vuoto, bit 2 chiuso, bit 3 radice, bit 7 occupato
+_MOVE_MASK = 0x03
+_CLOSED = 0x04
+_ROOT = 0x08
+_USED = 0x80
+
+
+class RankedStateStore:
+    """
+    Hash table ad indirizzamento aperto (scansione lineare) con chiave il
+    rango della board. Per slot: 'words' interi a 64 bit di chiave, un byte
+    di metadati (mossa a 2 bit + flag) e g su 16 bit. Raddoppia quando il
+    fattore di carico supera MAX_LOAD.
+    """
+    MAX_LOAD = 0.7
+
+    def __init__(self, size, capacity=1 << 16):
+        self.size = size
+        self.words = max(1, math.ceil(math.factorial(size * size).bit_length() / 64))
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self.bits = capacity.bit_length() - 1
+        self.count = 0
+        self.keys = array("Q", bytes(8 * capacity * self.words))
+        self.meta = bytearray(capacity)
+        self.g = array("H", bytes(2 * capacity))
+
+    def _slot(self, rank):
+        h = ((rank ^ (rank >> 29)) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        return h >> (64 - self.bits)
+
+    def _key_at(self, slot):
+        base = slot * self.words
+        key = 0
+        for w in range(self.words - 1, -1, -1):
+            key = (key << 64) | self.keys[base + w]
+        return key
+
+    def find(self, rank):
+        """Slot dello stato con questo rango, -1 se non presente."""
+        mask = self.capacity - 1
+        slot = self._slot(rank)
+        while self.meta[slot] & _USED:
+            if self._key_at(slot) == rank:
+                return slot
+            slot = (slot + 1) & mask
+        return -1
+
+    def insert(self, rank, g, move, root=False):
+        """Inserisce (o aggiorna) lo stato e restituisce il suo slot."""
+        if self.count + 1 > self.capacity * self.MAX_LOAD:
+            self._grow()
+        mask = self.capacity - 1
+        slot = self._slot(rank)
+        while self.meta[slot] & _USED:
+            if self._key_at(slot) == rank:
+                break
+            slot = (slot + 1) & mask
+        else:
+            self.count += 1
+            base = slot * self.words
+            rest = rank
+            for w in range(self.words):
+                self.keys[base + w] = rest & 0xFFFFFFFFFFFFFFFF
+                rest >>= 64
+        self.meta[slot] = _USED | (_ROOT if root else 0) | move
+        self.g[slot] = g
+        return slot
+
+    def _grow(self):
+        old = (self.capacity, self.words, self.keys, self.meta, self.g)
+        capacity, words, keys, meta, g = old
+        self._allocate(capacity * 2)
+        for slot in range(capacity):
+            if meta[slot] & _USED:
+                base = slot * words
+                rank = 0
+                for w in range(words - 1, -1, -1):
+                    rank = (rank << 64) | keys[base + w]
+                new_slot = self.insert(rank, g[slot], 0)
+                self.meta[new_slot] = meta[slot]
+
+    def is_closed(self, slot):
+        return self.meta[slot] & _CLOSED
+
+    def close(self, slot):
+        self.meta[slot] |= _CLOSED
+
+    def __len__(self):
+        return self.count
+
+    def memory_bytes(self):
+        return self.keys.itemsize * len(self.keys) + len(self.meta) + self.g.itemsize * len(self.g)
+
+    def path_positions(self, goal_board):
+        """
+        Posizioni del vuoto dalla radice fino a goal_board, ricavate all'indietro
+        annullando le mosse a 2 bit memorizzate.
+        """
+        size = self.size
+        deltas = (-size, size, -1, 1)
+        board = list(goal_board)
+        empty = board.index(0)
+        positions = []
+        while True:
+            meta = self.meta[self.find(rank_permutation(board))]
+            if meta & _ROOT:
+                break
+            positions.append(empty)
+            parent_empty = empty - deltas[meta & _MOVE_MASK]
+            board[empty], board[parent_empty] = board[parent_empty], 0
+            empty = parent_empty
+        return positions[::-1]
+
+
+def move_code(size, from_pos, to_pos):
+    """Codice a 2 bit della mossa del vuoto: 0 su, 1 giù, 2 sinistra, 3 destra."""
+    return (-size, size, -1, 1).index(to_pos - from_pos)
+
+
+def solve_astar_ranked(start_state, timeout=60, heuristic=None):
+    """
+    A* (no reopening) con lo store compatto: la open list contiene solo
+    (f, g, contatore, rango) e la board viene ricostruita con unrank quando il
+    nodo viene estratto; g, chiusura e mossa del padre stanno in un
+    RankedStateStore. Il cammino si ottiene rigiocando le mosse dallo stato
+    iniziale. Restituisce lo stesso dizionario di solve_astar.
+    """
+    size = start_state.size
+    n = size * size
+    dist = manhattan_table(size)
+    moves = move_table(size)
+    goal_rank = rank_permutation(get_goal_state(size).board)
+    store = RankedStateStore(size)
+
+    start_rank = rank_permutation(start_state.board)
+    if heuristic is None:
+        start_h = heuristic_manhattan(start_state)
+    else:
+        start_h = heuristic(start_state)
+    store.insert(start_rank, 0, 0, root=True)
+    open_list = [(start_h, 0, 0, start_rank)]
+    count = 0
+    nodes_expanded = 0
+    iterations = 0
+    start_time = time.time()
+
+    def finish(result):
+        result.update({"stored_states": len(store), "store_bytes": store.memory_bytes()})
+        return result
+
+    while open_list:
+        iterations += 1
+        if iterations % TIMEOUT_CHECK_INTERVAL == 0 and time.time() - start_time > timeout:
+            return finish({"status": "timeout", "time": timeout, "nodes_expanded": nodes_expanded})
+
+        f, current_g, _, rank = heapq.heappop(open_list)
+        slot = store.find(rank)
+        if store.is_closed(slot):
+            continue
+
+        board = unrank_permutation(rank, n)
+        if rank == goal_rank:
+            path = replay_blank_moves(start_state, store.path_positions(board))
+            return finish({
+                "status": "success",
+                "path": path,
+                "nodes_expanded": nodes_expanded,
+                "time": time.time() - start_time
+            })
+
+        store.close(slot)
+        nodes_expanded += 1
+        current_h = f - current_g
+        empty = board.index(0)
+
+        for new_pos in moves[empty]:
+            tile = board[new_pos]
+            board[empty], board[new_pos] = tile, 0
+            child_rank = rank_permutation(board)
+            child_slot = store.find(child_rank)
+            tentative_g = current_g + 1
+            if child_slot < 0 or (not store.is_closed(child_slot) and tentative_g < store.g[child_slot]):
+                if heuristic is None:
+                    h = current_h - dist[tile][new_pos] + dist[tile][empty]
+                else:
+                    h = heuristic(_BoardView(board, size))
+                store.insert(child_rank, tentative_g, move_code(size, empty, new_pos))
+                count += 1
+                heapq.heappush(open_list, (tentative_g + h, tentative_g, count, child_rank))
+            board[empty], board[new_pos] = 0, tile
+
+    return finish({"status": "failure"})
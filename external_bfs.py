@@ -0,0 +1,248 @@
+"""
+BFS esaustiva su disco (frontier search) a partire dal goal: ogni livello è un
+file binario di ranghi (uint64, ordinati e senza duplicati). Il livello d+1
+si ottiene espandendo il livello d a blocchi, ordinando ogni blocco in RAM
+(run su disco), e fondendo le run in streaming togliendo i duplicati e gli
+stati del livello d-1. Il grafo del puzzle è bipartito, quindi i vicini di
+un nodo a distanza d stanno solo ai livelli d-1 e d+1: non serve un insieme
+dei visitati. La RAM usata è limitata dalla dimensione del blocco.
+
+Lo stato dell'esplorazione è in manifest.json: un run interrotto riprende
+dall'ultimo livello completato.
+
+    python3 external_bfs.py 3 --verify
+"""
+import os
+import sys
+import json
+import time
+import heapq
+import shutil
+import argparse
+from array import array
+from collections import deque
+
+from homework_main import get_goal_state, move_table
+from compact_store import rank_permutation, unrank_permutation
+
+# Cartella in cui vengono salvati i livelli (una sottocartella per dimensione)
+BFS_CACHE_DIR = "bfs_cache"
+
+# Ranghi ordinati in RAM prima di scrivere una run su disco (8 byte l'uno)
+DEFAULT_CHUNK = 1 << 22
+
+# Ranghi letti per volta dai file
+READ_BLOCK = 1 << 16
+
+
+def layer_file(work_dir, depth):
+    return os.path.join(work_dir, f"layer_{depth:03d}.bin")
+
+def read_ranks(path):
+    """Generatore dei ranghi di un file, letti a blocchi."""
+    with open(path, "rb") as f:
+        while True:
+            block = array("Q")
+            try:
+                block.fromfile(f, READ_BLOCK)
+            except EOFError:
+                pass  # ultimo blocco parziale: fromfile ha letto quello che c'era
+            if not block:
+                return
+            yield from block
+
+def write_sorted_run(ranks, path):
+    """Ordina un blocco di ranghi e lo scrive su disco (già senza duplicati)."""
+    out = array("Q", sorted(set(ranks)))
+    with open(path, "wb") as f:
+        out.tofile(f)
+
+
+def expand_layer(layer_path, size, runs_dir, chunk):
+    """
+    Espande tutti gli stati di un livello e scrive i figli in run ordinate.
+    Restituisce la lista dei file delle run.
+    """
+    n = size * size
+    moves = move_table(size)
+    runs = []
+    buffer = array("Q")
+
+    def flush():
+        path = os.path.join(runs_dir, f"run_{len(runs):05d}.bin")
+        write_sorted_run(buffer, path)
+        runs.append(path)
+        del buffer[:]
+
+    for rank in read_ranks(layer_path):
+        board = unrank_permutation(rank, n)
+        empty = board.index(0)
+        for new_pos in moves[empty]:
+            tile = board[new_pos]
+            board[empty], board[new_pos] = tile, 0
+            buffer.append(rank_permutation(board))
+            board[empty], board[new_pos] = 0, tile
+        if len(buffer) >= chunk:
+            flush()
+    if buffer:
+        flush()
+    return runs
+
+def merge_runs(runs, previous_path, out_path):
+    """
+    Fusione in streaming delle run: scrive in out_path i ranghi distinti che
+    non compaiono nel livello precedente. Restituisce quanti ne ha scritti.
+    """
+    previous = read_ranks(previous_path) if previous_path else iter(())
+    prev = next(previous, None)
+    last = None
+    count = 0
+    out = array("Q")
+    with open(out_path, "wb") as f:
+        for rank in heapq.merge(*(read_ranks(p) for p in runs)):
+            if rank == last:
+                continue
+            last = rank
+            # Entrambe le sequenze sono ordinate: avanziamo il livello d-1
+            while prev is not None and prev < rank:
+                prev = next(previous, None)
+            if prev == rank:
+                continue
+            out.append(rank)
+            count += 1
+            if len(out) >= READ_BLOCK:
+                out.tofile(f)
+                del out[:]
+        out.tofile(f)
+    return count
+
+
+def load_manifest(work_dir, size):
+    path = os.path.join(work_dir, "manifest.json")
+    if os.path.exists(path):
+        with open(path) as f:
+            manifest = json.load(f)
+        if manifest["size"] != size:
+            raise ValueError(f"{work_dir} contiene una BFS per size={manifest['size']}")
+        return manifest
+    return None
+
+def save_manifest(work_dir, manifest):
+    path = os.path.join(work_dir, "manifest.json")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def external_bfs(size, work_dir=None, chunk=DEFAULT_CHUNK, max_depth=None, verbose=True):
+    """
+    BFS a livelli su disco dal goal di una griglia size x size.
+    Riprende da work_dir se contiene un run interrotto. Restituisce il
+    manifest: {"size", "layer_sizes", "layer_times", "complete"}.
+    """
+    work_dir = work_dir or os.path.join(BFS_CACHE_DIR, f"{size}x{size}")
+    os.makedirs(work_dir, exist_ok=True)
+    runs_dir = os.path.join(work_dir, "runs")
+
+    manifest = load_manifest(work_dir, size)
+    if manifest is None:
+        goal_rank = rank_permutation(get_goal_state(size).board)
+        with open(layer_file(work_dir, 0), "wb") as f:
+            array("Q", [goal_rank]).tofile(f)
+        manifest = {"size": size, "layer_sizes": [1], "layer_times": [0.0], "complete": False}
+        save_manifest(work_dir, manifest)
+    elif verbose and not manifest["complete"]:
+        print(f"Ripresa dal livello {len(manifest['layer_sizes']) - 1}")
+
+    while not manifest["complete"]:
+        depth = len(manifest["layer_sizes"]) - 1
+        if max_depth is not None and depth >= max_depth:
+            break
+        start_time = time.time()
+
+        # Run rimaste da un'interruzione: si ricomincia il livello da capo
+        shutil.rmtree(runs_dir, ignore_errors=True)
+        os.makedirs(runs_dir)
+        runs = expand_layer(layer_file(work_dir, depth), size, runs_dir, chunk)
+        previous_path = layer_file(work_dir, depth - 1) if depth > 0 else None
+        out_path = layer_file(work_dir, depth + 1)
+        count = merge_runs(runs, previous_path, out_path + ".tmp")
+        os.replace(out_path + ".tmp", out_path)
+        shutil.rmtree(runs_dir)
+
+        elapsed = time.time() - start_time
+        if count:
+            manifest["layer_sizes"].append(count)
+            manifest["layer_times"].append(elapsed)
+        else:
+            os.remove(out_path)
+            manifest["complete"] = True
+        save_manifest(work_dir, manifest)
+
+        if verbose and count:
+            expanded = manifest["layer_sizes"][depth]
+            print(f"Livello {depth + 1:3d}: {count:>14d} stati | {len(runs):4d} run | "
+                  f"{elapsed:8.2f}s | {expanded / max(elapsed, 1e-9):10.0f} espansi/s")
+
+    if verbose and manifest["complete"]:
+        total = sum(manifest["layer_sizes"])
+        elapsed = sum(manifest["layer_times"])
+        print(f"Completata: {total} stati, distanza massima {len(manifest['layer_sizes']) - 1}, "
+              f"{elapsed:.2f}s ({total / max(elapsed, 1e-9):.0f} stati/s)")
+    return manifest
+
+
+def layer_states(work_dir, size, depth):
+    """Generatore delle board (liste) a distanza ottima 'depth' dal goal."""
+    n = size * size
+    for rank in read_ranks(layer_file(work_dir, depth)):
+        yield unrank_permutation(rank, n)
+
+
+def in_memory_layer_sizes(size):
+    """BFS in RAM (solo per griglie piccole), usata per verificare external_bfs."""
+    moves = move_table(size)
+    start = tuple(get_goal_state(size).board)
+    depth_of = {start: 0}
+    queue = deque([start])
+    sizes = [1]
+    while queue:
+        board = queue.popleft()
+        d = depth_of[board]
+        empty = board.index(0)
+        for new_pos in moves[empty]:
+            child = list(board)
+            child[empty], child[new_pos] = board[new_pos], 0
+            child = tuple(child)
+            if child not in depth_of:
+                depth_of[child] = d + 1
+                if d + 1 == len(sizes):
+                    sizes.append(0)
+                sizes[d + 1] += 1
+                queue.append(child)
+    return sizes
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="BFS esaustiva su disco dal goal.")
+    parser.add_argument("size", type=int)
+    parser.add_argument("--work-dir", default=None)
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK,
+                        help="ranghi ordinati in RAM per run (8 byte l'uno)")
+    parser.add_argument("--max-depth", type=int, default=None)
+    parser.add_argument("--verify", action="store_true",
+                        help="confronta l'istogramma con una BFS in RAM (solo 3x3)")
+    args = parser.parse_args(argv[1:])
+
+    manifest = external_bfs(args.size, args.work_dir, args.chunk, args.max_depth)
+    if args.verify:
+        expected = in_memory_layer_sizes(args.size)
+        ok = manifest["complete"] and manifest["layer_sizes"] == expected
+        print("Verifica:", "OK" if ok else f"FALLITA (atteso {expected})")
+        return 0 if ok else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,73 @@
+"""
+Planner finto con la stessa interfaccia a riga di comando di fast-downward.py,
+per provare la pipeline PDDL senza avere Fast Downward installato:
+
+    python3 fake_planner.py domain.pddl problem.pddl --search "astar(lmcut())"
+
+Legge il problema, lo risolve con solve_astar e, come Fast Downward, scrive
+sas_plan nella cartella corrente e stampa "Expanded N state(s)." e
+"Total time: X.XXs". La variabile d'ambiente FAKE_PLANNER_DELAY (secondi)
+aggiunge un'attesa, utile per provare timeout ed esecuzioni concorrenti,
+durante la quale vengono stampate righe di avanzamento "... N expanded".
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from homework_main import PuzzleState, solve_astar
+
+
+def parse_problem(problem_file):
+    """Ricostruisce lo stato iniziale dai fatti (at ...) / (empty ...) di :init."""
+    with open(problem_file) as f:
+        text = f.read()
+    init = text[text.index("(:init"):text.index("(:goal")]
+
+    cells = {}
+    for tile, r, c in re.findall(r"\(at tile_(\d+) pos_(\d+)_(\d+)\)", init):
+        cells[(int(r), int(c))] = int(tile)
+    for r, c in re.findall(r"\(empty pos_(\d+)_(\d+)\)", init):
+        cells[(int(r), int(c))] = 0
+
+    size = int(len(cells) ** 0.5)
+    board = [cells[divmod(i, size)] for i in range(size * size)]
+    return PuzzleState(board, size)
+
+
+def main(argv):
+    problem_file = argv[2]
+    delay = float(os.environ.get("FAKE_PLANNER_DELAY", 0))
+    start_time = time.time()
+    expanded = 0
+    while time.time() - start_time < delay:
+        time.sleep(min(0.1, delay))
+        expanded += 100
+        print(f"[t={time.time() - start_time:.2f}s, 0 KB] f = 0, {expanded * 2} evaluated, {expanded} expanded",
+              flush=True)
+
+    state = parse_problem(problem_file)
+    res = solve_astar(state)
+    if res["status"] != "success":
+        print("Search stopped without finding a solution.")
+        return 12
+
+    size = state.size
+    with open("sas_plan", "w") as f:
+        for prev, nxt in zip(res["path"], res["path"][1:]):
+            # La tessera si sposta dalla nuova posizione del vuoto a quella vecchia
+            tile = prev.board[nxt.empty_pos]
+            fr, fc = divmod(nxt.empty_pos, size)
+            tr, tc = divmod(prev.empty_pos, size)
+            f.write(f"(slide tile_{tile} pos_{fr}_{fc} pos_{tr}_{tc})\n")
+        f.write(f"; cost = {len(res['path']) - 1} (unit cost)\n")
+
+    print("Solution found!")
+    print(f"Expanded {res['nodes_expanded']} state(s).")
+    print(f"Total time: {time.time() - start_time:.6f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -1,10 +1,15 @@
+import time
+import argparse
 import pandas as pd
 import matplotlib.pyplot as plt
 
-def generate_plots():
-    # Leggiamo il CSV
+from results_store import ResultAggregator
+
+def generate_plots(only_changed=False):
+    # Aggiorniamo le medie leggendo solo le righe aggiunte al CSV dall'ultima volta
     try:
-        df = pd.read_csv("benchmark_results.csv")
+        aggregator = ResultAggregator("benchmark_results.csv")
+        changed = aggregator.update()
     except FileNotFoundError:
         print("Errore: File benchmark_results.csv non trovato.")
         return
@@ -16,12 +21,14 @@ def generate_plots():
     ]
 
     for N, title in configurations:
-        data = df[df["N"] == N]
-        if data.empty:
+        # Nessuna riga nuova per questa dimensione: il grafico è già aggiornato
+        if only_changed and N not in changed:
             continue
 
-        # Calcoliamo la media per ogni step di shuffle
-        grouped = data.groupby("Shuffle_Steps")[["A*_Time", "Planner_Time", "A*_Nodes", "Planner_Nodes"]].mean()
+        # Media per ogni step di shuffle (già calcolata in modo incrementale)
+        grouped = pd.DataFrame.from_dict(aggregator.means(N), orient="index")
+        if grouped.empty:
+            continue
 
         # Creiamo la figura con 2 grafici affiancati
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
@@ -59,4 +66,12 @@ def generate_plots():
         plt.close()
 
 if __name__ == "__main__":
-    generate_plots()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Grafici dai risultati del benchmark")
+    parser.add_argument("--watch", type=float, default=None,
+                        help="Ogni quanti secondi ridisegnare i grafici con dati nuovi (benchmark in corso)")
+    args = parser.parse_args()
+
+    generate_plots()
+    while args.watch:
+        time.sleep(args.watch)
+        generate_plots(only_changed=True)
\ No newline at end of file
@@ -0,0 +1,206 @@
+"""
+Registro delle euristiche selezionabili per nome da tutti i solver
+(solve_astar(state, heuristic="walking_distance"), Solver(size, "pdb"), ...).
+Le tabelle sono costruite una volta per dimensione e salvate su disco in
+PDB_CACHE_DIR, come i pattern database:
+
+- "manhattan": distanza di Manhattan (nei solver resta quella incrementale);
+- "linear_conflict": Manhattan + conflitti lineari, tabella per riga/colonna
+  indicizzata dal contenuto della linea;
+- "walking_distance": walking distance di Takahashi, BFS sulle matrici
+  "tessere della riga r con goal nella riga g" (righe e colonne);
+- "pdb": pattern database additivo di pattern_db.
+"""
+import os
+import time
+import threading
+from array import array
+from collections import deque
+
+from homework_main import heuristic_manhattan, heuristic_linear_conflict, linear_conflict_table
+from pattern_db import PDB_CACHE_DIR, DEFAULT_PARTITIONS, PatternDatabase, pattern_file
+
+# La tabella della walking distance esplode oltre il 15-puzzle (milioni di matrici per 5x5)
+WALKING_DISTANCE_MAX_SIZE = 4
+
+
+def _save_atomic(path, chunks):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(tmp_path, path)
+
+
+class ManhattanHeuristic:
+    """Distanza di Manhattan, senza tabelle."""
+    def __init__(self, size, cache_dir=PDB_CACHE_DIR):
+        self.size = size
+        self.build_time = 0.0
+        self.from_disk = False
+
+    def __call__(self, state):
+        return heuristic_manhattan(state)
+
+    def table_bytes(self):
+        return 0
+
+
+class LinearConflictHeuristic:
+    """
+    Manhattan + conflitti lineari. La tabella di linear_conflict_table viene
+    letta da disco se presente (e messa nella cache di homework_main, così
+    anche heuristic_linear_conflict la usa), altrimenti costruita e salvata.
+    """
+    def __init__(self, size, cache_dir=PDB_CACHE_DIR):
+        self.size = size
+        path = os.path.join(cache_dir, f"linear_conflict_{size}.bin")
+        start = time.time()
+        self.from_disk = os.path.exists(path)
+        if self.from_disk:
+            with open(path, "rb") as f:
+                self.table = linear_conflict_table(size, f.read())
+        else:
+            self.table = linear_conflict_table(size)
+            _save_atomic(path, [self.table])
+        self.build_time = time.time() - start
+
+    def __call__(self, state):
+        return heuristic_linear_conflict(state)
+
+    def table_bytes(self):
+        return len(self.table)
+
+
+def _wd_encode(counts, blank_row, base, size):
+    code = 0
+    for i in range(len(counts) - 1, -1, -1):
+        code = code * base + counts[i]
+    return code * size + blank_row
+
+def build_walking_distance_table(size):
+    """
+    BFS sugli stati della walking distance: matrice counts[r * size + g] =
+    tessere nella riga r il cui goal è nella riga g, più la riga del vuoto.
+    Una mossa porta nella riga del vuoto una tessera di una riga adiacente.
+    Restituisce {codice dello stato: distanza}.
+    """
+    base = size + 1
+    goal = [0] * (size * size)
+    for g in range(size):
+        goal[g * size + g] = size
+    goal[size * size - 1] = size - 1  # nell'ultima riga c'è il vuoto
+    distances = {_wd_encode(goal, size - 1, base, size): 0}
+    queue = deque([(goal, size - 1, 0)])
+    while queue:
+        counts, blank, d = queue.popleft()
+        for row in (blank - 1, blank + 1):
+            if not 0 <= row < size:
+                continue
+            for g in range(size):
+                if counts[row * size + g]:
+                    child = list(counts)
+                    child[row * size + g] -= 1
+                    child[blank * size + g] += 1
+                    key = _wd_encode(child, row, base, size)
+                    if key not in distances:
+                        distances[key] = d + 1
+                        queue.append((child, row, d + 1))
+    return distances
+
+
+class WalkingDistanceHeuristic:
+    """
+    Walking distance verticale + orizzontale. Per simmetria la stessa tabella
+    vale per le colonne (goal del vuoto nell'ultima riga e nell'ultima colonna).
+    Su disco: conteggio, codici (uint64) e distanze (uint8).
+    """
+    def __init__(self, size, cache_dir=PDB_CACHE_DIR):
+        if size > WALKING_DISTANCE_MAX_SIZE:
+            raise ValueError(f"walking distance disponibile solo fino a {WALKING_DISTANCE_MAX_SIZE}x"
+                             f"{WALKING_DISTANCE_MAX_SIZE}")
+        self.size = size
+        path = os.path.join(cache_dir, f"walking_distance_{size}.bin")
+        start = time.time()
+        self.from_disk = os.path.exists(path)
+        if self.from_disk:
+            with open(path, "rb") as f:
+                header = array("Q")
+                header.fromfile(f, 1)
+                codes = array("Q")
+                codes.fromfile(f, header[0])
+                values = f.read()
+            self.table = dict(zip(codes, values))
+        else:
+            self.table = build_walking_distance_table(size)
+            codes = array("Q", self.table.keys())
+            _save_atomic(path, [array("Q", [len(codes)]), codes, bytes(self.table.values())])
+        self.build_time = time.time() - start
+
+        # Contributo di ogni (tessera, posizione) ai codici di righe e colonne
+        base = size + 1
+        n = size * size
+        self.row_weight = [[0] * n for _ in range(n)]
+        self.col_weight = [[0] * n for _ in range(n)]
+        for tile in range(1, n):
+            goal_row, goal_col = divmod(tile - 1, size)
+            for pos in range(n):
+                r, c = divmod(pos, size)
+                self.row_weight[tile][pos] = base ** (r * size + goal_row)
+                self.col_weight[tile][pos] = base ** (c * size + goal_col)
+
+    def evaluate(self, board):
+        size = self.size
+        row_code = 0
+        col_code = 0
+        empty = 0
+        row_weight = self.row_weight
+        col_weight = self.col_weight
+        for pos, tile in enumerate(board):
+            if tile:
+                row_code += row_weight[tile][pos]
+                col_code += col_weight[tile][pos]
+            else:
+                empty = pos
+        r, c = divmod(empty, size)
+        return self.table[row_code * size + r] + self.table[col_code * size + c]
+
+    def __call__(self, state):
+        return self.evaluate(state.board)
+
+    def table_bytes(self):
+        # Su disco: 8 byte di codice + 1 di distanza per stato
+        return 9 * len(self.table)
+
+
+class PatternDatabaseHeuristic(PatternDatabase):
+    """PatternDatabase con la stessa interfaccia delle altre voci del registro."""
+    def __init__(self, size, cache_dir=PDB_CACHE_DIR):
+        self.from_disk = all(os.path.exists(pattern_file(size, tiles, cache_dir))
+                             for tiles in DEFAULT_PARTITIONS[size])
+        super().__init__(size, cache_dir=cache_dir)
+        self.build_time = self.load_time
+
+
+HEURISTICS = {
+    "manhattan": ManhattanHeuristic,
+    "linear_conflict": LinearConflictHeuristic,
+    "walking_distance": WalkingDistanceHeuristic,
+    "pdb": PatternDatabaseHeuristic,
+}
+
+# Euristiche già caricate, per (nome, dimensione)
+_LOADED = {}
+
+def get_heuristic(name, size, cache_dir=PDB_CACHE_DIR):
+    """
+    Euristica 'name' per griglie size x size (funzione state -> h), con le
+    tabelle costruite o lette da disco alla prima richiesta.
+    """
+    if name not in HEURISTICS:
+        raise ValueError(f"heuristic sconosciuta: {name} (disponibili: {', '.join(HEURISTICS)})")
+    heuristic = _LOADED.get((name, size))
+    if heuristic is None:
+        heuristic = _LOADED[(name, size)] = HEURISTICS[name](size, cache_dir)
+    return heuristic
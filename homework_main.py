@@ -4,9 +4,34 @@ import time
 import subprocess
 import re
 import os
+import signal
 import random
+import tempfile
+import hashlib
+import contextlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 
+# Posizioni adiacenti a ogni casella, una tabella per dimensione
+_MOVE_TABLES = {}
+
+def move_table(size):
+    """table[pos] = tupla delle caselle in cui il vuoto può spostarsi da 'pos'."""
+    table = _MOVE_TABLES.get(size)
+    if table is None:
+        table = []
+        for pos in range(size * size):
+            x, y = divmod(pos, size)
+            targets = []
+            for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < size and 0 <= ny < size:
+                    targets.append(nx * size + ny)
+            table.append(tuple(targets))
+        _MOVE_TABLES[size] = table
+    return table
+
 
 class PuzzleState:
     """Rappresenta uno stato del Generalized N-Puzzle."""
@@ -26,28 +51,25 @@ class PuzzleState:
         return self.board == other.board
 
     def is_goal(self):
-        expected = tuple(list(range(1, self.size**2)) + [0])
-        return self.board == expected
+        return self.board == goal_board(self.size)
 
-    def get_neighbors(self):
-        neighbors = []
-        x, y = divmod(self.empty_pos, self.size)
-        
-        # Movimenti possibili: Su, Giù, Sinistra, Destra
-        moves = [(-1, 0), (1, 0), (0, -1), (0, 1)] 
-        
-        for dx, dy in moves:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < self.size and 0 <= ny < self.size:
-                # Calcolo nuovo indice lineare
-                new_pos = nx * self.size + ny
-                
-                # Scambio le tessere
-                new_board = list(self.board)
-                new_board[self.empty_pos], new_board[new_pos] = new_board[new_pos], new_board[self.empty_pos]
-                
-                neighbors.append(PuzzleState(tuple(new_board), self.size, new_pos))
-        return neighbors
+    def tile_at(self, pos):
+        return self.board[pos]
+
+    def get_neighbors(self, parent_pos=None):
+        """
+        Genera i vicini uno alla volta. Se parent_pos (posizione del vuoto nel
+        padre) è dato, la mossa che riporta al padre viene saltata.
+        """
+        board = self.board
+        empty = self.empty_pos
+        for new_pos in move_table(self.size)[empty]:
+            if new_pos == parent_pos:
+                continue
+            # Scambio le tessere: la tessera in new_pos scivola nel vuoto
+            new_board = list(board)
+            new_board[empty], new_board[new_pos] = board[new_pos], 0
+            yield PuzzleState(new_board, self.size, new_pos)
 
     def __str__(self):
         # Utility per stampare la griglia
@@ -56,6 +78,108 @@ class PuzzleState:
             res.append(str(self.board[i:i+self.size]))
         return "\n".join(res)
 
+
+# --- Rappresentazione compatta (board impacchettata in un intero) ---
+
+def bits_per_tile(size):
+    """Bit usati per ogni tessera: 4 per N<=4, 5 per N=5, 6 per N=6."""
+    return max(4, (size * size - 1).bit_length())
+
+def pack_board(board, size):
+    """Impacchetta la board in un unico intero (tessera i-esima nei bit i*b...)."""
+    bits = bits_per_tile(size)
+    code = 0
+    for i, val in enumerate(board):
+        code |= val << (i * bits)
+    return code
+
+def unpack_board(code, size):
+    """Operazione inversa di pack_board: restituisce la tupla della board."""
+    bits = bits_per_tile(size)
+    mask = (1 << bits) - 1
+    return tuple((code >> (i * bits)) & mask for i in range(size * size))
+
+
+# Codice del goal per ogni dimensione (calcolato una sola volta)
+_GOAL_CODES = {}
+
+
+class PackedPuzzleState:
+    """
+    Variante compatta di PuzzleState: la board è un singolo intero e l'oggetto
+    non ha __dict__ (__slots__), quindi ogni nodo memorizzato in g_score,
+    came_from e closed_set costa molto meno. I vicini si ottengono in O(1)
+    spostando i bit della tessera che scivola nella casella vuota.
+    """
+    __slots__ = ("code", "size", "empty_pos")
+
+    def __init__(self, code, size, empty_pos):
+        self.code = code
+        self.size = size
+        self.empty_pos = empty_pos
+
+    @classmethod
+    def from_state(cls, state):
+        return cls(pack_board(state.board, state.size), state.size, state.empty_pos)
+
+    def to_puzzle_state(self):
+        return PuzzleState(self.board, self.size, self.empty_pos)
+
+    @property
+    def board(self):
+        # Compatibilità con le euristiche che leggono state.board
+        return unpack_board(self.code, self.size)
+
+    def tile_at(self, pos):
+        bits = bits_per_tile(self.size)
+        return (self.code >> (pos * bits)) & ((1 << bits) - 1)
+
+    def __hash__(self):
+        return hash(self.code)
+
+    def __eq__(self, other):
+        return self.code == other.code
+
+    def is_goal(self):
+        goal_code = _GOAL_CODES.get(self.size)
+        if goal_code is None:
+            goal_code = _GOAL_CODES[self.size] = pack_board(goal_board(self.size), self.size)
+        return self.code == goal_code
+
+    def get_neighbors(self, parent_pos=None):
+        size = self.size
+        bits = bits_per_tile(size)
+        mask = (1 << bits) - 1
+        empty = self.empty_pos
+        code = self.code
+
+        for new_pos in move_table(size)[empty]:
+            if new_pos == parent_pos:
+                continue
+            # La tessera in new_pos scivola nella casella vuota (che vale 0)
+            tile = (code >> (new_pos * bits)) & mask
+            new_code = code - (tile << (new_pos * bits)) + (tile << (empty * bits))
+            yield PackedPuzzleState(new_code, size, new_pos)
+
+    def __str__(self):
+        return str(self.to_puzzle_state())
+
+
+def measure_peak_memory(func, *args, **kwargs):
+    """(risultato di func, picco di memoria allocata in byte durante la chiamata) con tracemalloc."""
+    import tracemalloc
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    try:
+        result = func(*args, **kwargs)
+        return result, tracemalloc.get_traced_memory()[1] - base
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
 # --- Euristiche ---
 
 def heuristic_manhattan(state):
@@ -75,21 +199,273 @@ def heuristic_manhattan(state):
         distance += abs(curr_row - target_row) + abs(curr_col - target_col)
     return distance
 
+# Tabelle distanza[tessera][posizione] verso il goal, una per dimensione
+_MANHATTAN_TABLES = {}
+
+def build_distance_table(target_board, size):
+    """
+    Precalcola table[tile][pos] = distanza di Manhattan tra 'pos' e la casella
+    che 'tile' occupa in target_board (0 per il vuoto).
+    """
+    target_pos = [0] * (size * size)
+    for i, val in enumerate(target_board):
+        target_pos[val] = i
+    table = []
+    for tile in range(size * size):
+        if tile == 0:
+            table.append([0] * (size * size))
+            continue
+        tr, tc = divmod(target_pos[tile], size)
+        row = []
+        for pos in range(size * size):
+            r, c = divmod(pos, size)
+            row.append(abs(r - tr) + abs(c - tc))
+        table.append(row)
+    return table
+
+def manhattan_table(size):
+    """Tabella delle distanze di Manhattan verso il goal (costruita una volta per size)."""
+    table = _MANHATTAN_TABLES.get(size)
+    if table is None:
+        table = _MANHATTAN_TABLES[size] = build_distance_table(get_goal_state(size).board, size)
+    return table
+
+# Tabelle dei conflitti lineari, una per dimensione
+_LINEAR_CONFLICT_TABLES = {}
+
+def linear_conflict_table(size, data=None):
+    """
+    Tabella dei conflitti lineari di una riga (o colonna) indicizzata dal suo
+    contenuto. Codice della linea: somma su p di d_p * (size+1)^p, dove d_p è
+    1 + la posizione goal lungo la linea della tessera in p se la tessera
+    appartiene a quella linea, altrimenti 0. Il valore è 2 * (k - LIS): le
+    tessere da togliere dalla linea perché le altre siano già in ordine.
+    Con 'data' (es. la tabella salvata su disco) la tabella viene impostata
+    invece che costruita.
+    """
+    base = size + 1
+    if data is not None:
+        if len(data) != base ** size:
+            raise ValueError(f"Tabella dei conflitti lineari di {len(data)} byte, attesi {base ** size}")
+        table = _LINEAR_CONFLICT_TABLES[size] = bytearray(data)
+        return table
+    table = _LINEAR_CONFLICT_TABLES.get(size)
+    if table is not None:
+        return table
+
+    table = bytearray(base ** size)
+    for code in range(len(table)):
+        seq = []
+        rest = code
+        for _ in range(size):
+            rest, digit = divmod(rest, base)
+            if digit:
+                seq.append(digit)
+        # Sottosequenza crescente più lunga (le linee hanno al massimo size tessere)
+        best = [1] * len(seq)
+        for i in range(len(seq)):
+            for j in range(i):
+                if seq[j] < seq[i] and best[j] + 1 > best[i]:
+                    best[i] = best[j] + 1
+        table[code] = 2 * (len(seq) - max(best, default=0))
+    _LINEAR_CONFLICT_TABLES[size] = table
+    return table
+
+def heuristic_linear_conflict(state):
+    """Manhattan + conflitti lineari su righe e colonne (ammissibile)."""
+    size = state.size
+    board = state.board
+    table = linear_conflict_table(size)
+    base = size + 1
+    conflicts = 0
+    for line in range(size):
+        row_code = 0
+        col_code = 0
+        weight = 1
+        for p in range(size):
+            # Riga 'line', colonna p
+            val = board[line * size + p]
+            if val and (val - 1) // size == line:
+                row_code += ((val - 1) % size + 1) * weight
+            # Colonna 'line', riga p
+            val = board[p * size + line]
+            if val and (val - 1) % size == line:
+                col_code += ((val - 1) // size + 1) * weight
+            weight *= base
+        conflicts += table[row_code] + table[col_code]
+    return heuristic_manhattan(state) + conflicts
+
+def resolve_heuristic(heuristic, size):
+    """
+    Euristica da passare ai solver: None o "manhattan" -> None (Manhattan
+    incrementale), un nome del registro di heuristics.py (es.
+    "walking_distance") -> la sua funzione, altrimenti la funzione data.
+    """
+    if heuristic is None or heuristic == "manhattan":
+        return None
+    if isinstance(heuristic, str):
+        from heuristics import get_heuristic
+        return get_heuristic(heuristic, size)
+    return heuristic
+
+# --- Open list ---
+
+class HeapOpenList:
+    """Open list classica su heapq: elementi (f, g, contatore, stato)."""
+    def __init__(self):
+        self.heap = []
+        # Contatore per evitare confronti tra stati in caso di parità di f e g
+        self.count = 0
+        self.pushes = 0
+        self.peak_size = 0
+
+    def push(self, f, g, state):
+        self.count += 1
+        heapq.heappush(self.heap, (f, g, self.count, state))
+        self.pushes += 1
+        if len(self.heap) > self.peak_size:
+            self.peak_size = len(self.heap)
+
+    def pop(self):
+        f, g, _, state = heapq.heappop(self.heap)
+        return f, g, state
+
+    def __len__(self):
+        return len(self.heap)
+
+
+class BucketOpenList:
+    """
+    Coda a bucket indicizzata sugli f interi: buckets[f][g] è una lista LIFO.
+    Con costi unitari ed euristiche intere f è piccolo e limitato, quindi push
+    e pop sono O(1) ammortizzati e non si allocano tuple. A parità di f viene
+    estratto il nodo con g più alta (il più profondo).
+    """
+    def __init__(self):
+        self.buckets = []
+        self.min_f = 0
+        self.size = 0
+        self.pushes = 0
+        self.peak_size = 0
+
+    def push(self, f, g, state):
+        buckets = self.buckets
+        while len(buckets) <= f:
+            buckets.append([])
+        by_g = buckets[f]
+        while len(by_g) <= g:
+            by_g.append([])
+        by_g[g].append(state)
+
+        if f < self.min_f:
+            self.min_f = f
+        self.size += 1
+        self.pushes += 1
+        if self.size > self.peak_size:
+            self.peak_size = self.size
+
+    def pop(self):
+        if not self.size:
+            raise IndexError("pop from empty open list")
+        f = self.min_f
+        while True:
+            by_g = self.buckets[f]
+            # Scartiamo le liste vuote in coda: l'ultima rimasta è la g massima
+            while by_g and not by_g[-1]:
+                by_g.pop()
+            if by_g:
+                break
+            f += 1
+        self.min_f = f
+        self.size -= 1
+        return f, len(by_g) - 1, by_g[-1].pop()
+
+    def __len__(self):
+        return self.size
+
+
+OPEN_LISTS = {"heap": HeapOpenList, "bucket": BucketOpenList}
+
 # --- Algoritmo A* ---
 
-def solve_astar(start_state, timeout=60):
-    """Implementazione A* come da Slide 32 (No reopening)."""
+class SearchStats:
+    """
+    Contatori opzionali del ciclo principale di solve_astar. Si passa
+    un'istanza con stats=SearchStats(); se stats è None (default) il ciclo
+    non misura nulla e l'overhead è trascurabile.
+    """
+    __slots__ = ("nodes_generated", "duplicates_skipped", "reopen_attempts",
+                 "pushes", "pops", "peak_open", "peak_closed",
+                 "time_heuristic", "time_neighbors", "time_queue")
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def solve_astar(start_state, timeout=60, state_repr="tuple", incremental_h=True, heuristic=None,
+                open_list="heap", stats=None, store="dict", measure_memory=False):
+    """
+    Implementazione A* come da Slide 32 (No reopening).
+
+    state_repr: "tuple" usa PuzzleState, "packed" usa PackedPuzzleState
+    (board impacchettata in un intero, meno memoria per nodo).
+    incremental_h: se True l'euristica del figlio si ricava in O(1) da quella
+    del padre (h = f - g), aggiornando solo il contributo della tessera mossa.
+    heuristic: funzione state -> h alternativa a Manhattan (es. PatternDatabase)
+    o nome del registro di heuristics.py; in quel caso l'euristica viene
+    calcolata da zero per ogni figlio.
+    open_list: "heap" (heapq) oppure "bucket" (BucketOpenList).
+    stats: SearchStats da riempire (nodi generati, duplicati, push/pop, picchi
+    di open/closed e tempo speso in euristica, vicini e coda).
+    store: "dict" (dizionari di stati) oppure "ranked", che delega a
+    compact_store.solve_astar_ranked (ranghi di permutazione + mossa a 2 bit),
+    che non supporta state_repr, open_list, stats e incremental_h=False.
+    measure_memory: se True la ricerca gira sotto tracemalloc e il risultato
+    contiene "bytes_per_node", picco di memoria / stati memorizzati, con lo
+    stesso significato per entrambi gli store (la ricerca è più lenta).
+    """
+    if measure_memory:
+        res, peak = measure_peak_memory(solve_astar, start_state, timeout=timeout, state_repr=state_repr,
+                                        incremental_h=incremental_h, heuristic=heuristic, open_list=open_list,
+                                        stats=stats, store=store)
+        res["bytes_per_node"] = peak / max(res.get("stored_states", 0), 1)
+        return res
+    heuristic = resolve_heuristic(heuristic, start_state.size)
+    if store == "ranked":
+        unsupported = [name for name, value, default in (("state_repr", state_repr, "tuple"),
+                                                          ("open_list", open_list, "heap"),
+                                                          ("stats", stats, None),
+                                                          ("incremental_h", incremental_h, True))
+                       if value != default]
+        if unsupported:
+            raise ValueError(f"store='ranked' non supporta: {', '.join(unsupported)}")
+        from compact_store import solve_astar_ranked
+        return solve_astar_ranked(start_state, timeout=timeout, heuristic=heuristic)
+    elif store != "dict":
+        raise ValueError(f"store sconosciuto: {store}")
+    if heuristic is not None:
+        incremental_h = False
+    else:
+        heuristic = heuristic_manhattan
+    if state_repr == "packed":
+        start_state = PackedPuzzleState.from_state(start_state)
+    elif state_repr != "tuple":
+        raise ValueError(f"state_repr sconosciuto: {state_repr}")
+    instrument = stats is not None
+    clock = time.perf_counter
     
-    # Priority Queue: (f_score, g_score, state_object)
-    # g_score serve anche come tie-breaker parziale o solo informativo
-    # Aggiungo un contatore 'c' per evitare confronti tra stati in caso di parità di f
-    count = 0 
-    open_list = []
+    # Priority Queue su f_score; g_score fa da tie-breaker
+    open_list = OPEN_LISTS[open_list]()
     start_time = time.time()
     
     
-    h = heuristic_manhattan(start_state)
-    heapq.heappush(open_list, (h, 0, count, start_state))
+    h = heuristic(start_state)
+    open_list.push(h, 0, start_state)
+    dist = manhattan_table(start_state.size)
     
     # Per ricostruire il percorso: came_from[state] = parent_state
     came_from = {start_state: None}
@@ -101,46 +477,103 @@ def solve_astar(start_state, timeout=60):
     closed_set = set()
     
     nodes_expanded = 0
+    # Duplicati obsoleti estratti dalla open list (stato già chiuso)
+    stale_pops = 0
+    iterations = 0
+    
+    def finish(result):
+        result.update({"stored_states": len(g_score), "pushes": open_list.pushes,
+                       "stale_pops": stale_pops, "peak_open": open_list.peak_size})
+        if instrument:
+            stats.pushes = open_list.pushes
+            stats.peak_open = open_list.peak_size
+            stats.peak_closed = len(closed_set)
+            result["stats"] = stats.as_dict()
+        return result
     
     start_time = time.time()
     
     while open_list:
-        if time.time() - start_time > timeout:
-            return {"status": "timeout", "time": timeout, "nodes_expanded": nodes_expanded}
+        # Il timeout viene controllato solo ogni TIMEOUT_CHECK_INTERVAL iterazioni
+        iterations += 1
+        if iterations % TIMEOUT_CHECK_INTERVAL == 0 and time.time() - start_time > timeout:
+            return finish({"status": "timeout", "time": timeout, "nodes_expanded": nodes_expanded})
         
-        f, current_g, _, current = heapq.heappop(open_list)
+        if instrument:
+            t0 = clock()
+            f, current_g, current = open_list.pop()
+            stats.time_queue += clock() - t0
+            stats.pops += 1
+        else:
+            f, current_g, current = open_list.pop()
         
         if current in closed_set:
+            stale_pops += 1
             continue
             
         if current.is_goal():
             end_time = time.time()
-            return {
+            path = reconstruct_path(came_from, current)
+            if state_repr == "packed":
+                path = [s.to_puzzle_state() for s in path]
+            return finish({
                 "status": "success",
-                "path": reconstruct_path(came_from, current),
+                "path": path,
                 "nodes_expanded": nodes_expanded,
                 "time": end_time - start_time
-            }
+            })
         
         closed_set.add(current)
         nodes_expanded += 1
+        current_h = f - current_g
+        
+        # Il padre è già chiuso: la mossa inversa non viene nemmeno generata
+        parent = came_from[current]
+        parent_pos = parent.empty_pos if parent is not None else None
+        if instrument:
+            t0 = clock()
+            neighbors = list(current.get_neighbors(parent_pos))
+            stats.time_neighbors += clock() - t0
+            stats.nodes_generated += len(neighbors)
+        else:
+            neighbors = current.get_neighbors(parent_pos)
         
-        for neighbor in current.get_neighbors():
+        for neighbor in neighbors:
+            tentative_g = current_g + 1 # Costo passo sempre 1
+            
             if neighbor in closed_set:
+                if instrument:
+                    stats.duplicates_skipped += 1
+                    # Cammino migliore verso uno stato chiuso: non lo riapriamo
+                    if tentative_g < g_score[neighbor]:
+                        stats.reopen_attempts += 1
                 continue
             
-            tentative_g = current_g + 1 # Costo passo sempre 1
-            
             # Se è un nuovo stato o abbiamo trovato una via migliore (anche se 'no reopening' 
             # implica che non riapriamo closed, dobbiamo gestire se è in open)
             if neighbor not in g_score or tentative_g < g_score[neighbor]:
                 came_from[neighbor] = current
                 g_score[neighbor] = tentative_g
-                f_neighbor = tentative_g + heuristic_manhattan(neighbor)
-                count += 1
-                heapq.heappush(open_list, (f_neighbor, tentative_g, count, neighbor))
+                if instrument:
+                    t0 = clock()
+                if incremental_h:
+                    # La tessera in neighbor.empty_pos scivola in current.empty_pos
+                    tile = current.tile_at(neighbor.empty_pos)
+                    h_neighbor = current_h - dist[tile][neighbor.empty_pos] + dist[tile][current.empty_pos]
+                else:
+                    h_neighbor = heuristic(neighbor)
+                f_neighbor = tentative_g + h_neighbor
+                if instrument:
+                    t1 = clock()
+                    open_list.push(f_neighbor, tentative_g, neighbor)
+                    stats.time_heuristic += t1 - t0
+                    stats.time_queue += clock() - t1
+                else:
+                    open_list.push(f_neighbor, tentative_g, neighbor)
+            elif instrument:
+                stats.duplicates_skipped += 1
                 
-    return {"status": "failure"}
+    return finish({"status": "failure"})
 
 def reconstruct_path(came_from, current):
     path = [current]
@@ -150,86 +583,604 @@ def reconstruct_path(came_from, current):
     return path[::-1]
 
 
+# --- A* bidirezionale ---
+
+def solve_bidirectional(start_state, timeout=60):
+    """
+    A* bidirezionale (front-to-end): una ricerca in avanti dallo stato
+    iniziale verso il goal con Manhattan rispetto al goal, e una all'indietro
+    dal goal verso lo stato iniziale con Manhattan rispetto allo stato iniziale
+    (le mosse sono tutte reversibili). A ogni passo si espande il lato con la
+    open list più piccola. Il costo U del miglior incontro è ottimo quando
+    U <= max(fmin_avanti, fmin_indietro).
+    Restituisce lo stesso dizionario di solve_astar più i nodi espansi per lato.
+    """
+    size = start_state.size
+    goal_state = get_goal_state(size)
+    start_time = time.time()
+    if start_state == goal_state:
+        return {"status": "success", "path": [start_state], "nodes_expanded": 0,
+                "nodes_expanded_forward": 0, "nodes_expanded_backward": 0,
+                "time": time.time() - start_time}
+
+    # Lato 0 = avanti (start -> goal), lato 1 = indietro (goal -> start)
+    roots = (start_state, goal_state)
+    dists = (manhattan_table(size), build_distance_table(start_state.board, size))
+    open_lists = ([], [])
+    g_scores = ({start_state: 0}, {goal_state: 0})
+    came_from = ({start_state: None}, {goal_state: None})
+    closed_sets = (set(), set())
+    expanded = [0, 0]
+    count = 0
+
+    for side in (0, 1):
+        h = sum(dists[side][val][i] for i, val in enumerate(roots[side].board))
+        heapq.heappush(open_lists[side], (h, 0, count, roots[side]))
+
+    best_cost = math.inf
+    meeting = None
+    iterations = 0
+
+    while open_lists[0] and open_lists[1]:
+        iterations += 1
+        if iterations % TIMEOUT_CHECK_INTERVAL == 0 and time.time() - start_time > timeout:
+            return {"status": "timeout", "time": timeout, "nodes_expanded": sum(expanded),
+                    "nodes_expanded_forward": expanded[0], "nodes_expanded_backward": expanded[1]}
+
+        # Togliamo dalla cima i duplicati obsoleti per leggere gli fmin corretti
+        for side in (0, 1):
+            heap = open_lists[side]
+            while heap and (heap[0][3] in closed_sets[side] or heap[0][1] > g_scores[side][heap[0][3]]):
+                heapq.heappop(heap)
+        if not open_lists[0] or not open_lists[1]:
+            break
+        if best_cost <= max(open_lists[0][0][0], open_lists[1][0][0]):
+            break
+
+        side = 0 if len(open_lists[0]) <= len(open_lists[1]) else 1
+        other = 1 - side
+        f, current_g, _, current = heapq.heappop(open_lists[side])
+        closed_sets[side].add(current)
+        expanded[side] += 1
+        current_h = f - current_g
+        dist = dists[side]
+
+        parent = came_from[side][current]
+        for neighbor in current.get_neighbors(parent.empty_pos if parent is not None else None):
+            if neighbor in closed_sets[side]:
+                continue
+            tentative_g = current_g + 1
+            if tentative_g < g_scores[side].get(neighbor, math.inf):
+                g_scores[side][neighbor] = tentative_g
+                came_from[side][neighbor] = current
+                tile = current.board[neighbor.empty_pos]
+                h_neighbor = current_h - dist[tile][neighbor.empty_pos] + dist[tile][current.empty_pos]
+                count += 1
+                heapq.heappush(open_lists[side], (tentative_g + h_neighbor, tentative_g, count, neighbor))
+
+                # Le due frontiere si toccano: candidato per il cammino migliore
+                other_g = g_scores[other].get(neighbor)
+                if other_g is not None and tentative_g + other_g < best_cost:
+                    best_cost = tentative_g + other_g
+                    meeting = neighbor
+
+    if meeting is None:
+        return {"status": "failure"}
+
+    # Cammino: start -> meeting (lato avanti) + meeting -> goal (lato indietro)
+    path = reconstruct_path(came_from[0], meeting)
+    current = came_from[1][meeting]
+    while current is not None:
+        path.append(current)
+        current = came_from[1][current]
+
+    return {
+        "status": "success",
+        "path": path,
+        "nodes_expanded": sum(expanded),
+        "nodes_expanded_forward": expanded[0],
+        "nodes_expanded_backward": expanded[1],
+        "time": time.time() - start_time
+    }
+
+# --- A* pesato e anytime (ARA*) ---
+
+# Pesi usati in sequenza da solve_anytime_astar (l'ultimo, 1, dà la soluzione ottima)
+DEFAULT_ARA_WEIGHTS = (5.0, 3.0, 2.0, 1.5, 1.25, 1.0)
+
+def solve_anytime_astar(start_state, timeout=60, weights=DEFAULT_ARA_WEIGHTS, heuristic=None, on_solution=None):
+    """
+    Anytime Repairing A* (Likhachev et al.): una serie di ricerche A* pesate
+    con f = g + w*h e pesi decrescenti che riusano il lavoro fatto. Ogni
+    ricerca si ferma appena il goal ha f minima; gli stati migliorati dopo
+    essere stati chiusi finiscono in INCONS e rientrano in open al peso
+    successivo. Ogni nuova soluzione viene registrata (e passata a
+    on_solution, se dato) con tempo, lunghezza e limite di subottimalità.
+
+    Restituisce il dizionario di solve_astar con la soluzione migliore e in
+    più "solutions" (la curva di qualità), "bound" e "optimal". Lo status è
+    "success" se almeno una soluzione è stata trovata prima del timeout.
+    """
+    size = start_state.size
+    goal = goal_board(size)
+    dist = manhattan_table(size)
+    heuristic = resolve_heuristic(heuristic, size)
+
+    h_score = {start_state: heuristic(start_state) if heuristic is not None else heuristic_manhattan(start_state)}
+    g_score = {start_state: 0}
+    came_from = {start_state: None}
+    goal_state = None
+    solutions = []
+    nodes_expanded = 0
+    iterations = 0
+    count = 0
+    start_time = time.time()
+
+    def expired(i):
+        # Anche i cicli O(|open|) tra un peso e l'altro controllano il timeout
+        return i % TIMEOUT_CHECK_INTERVAL == 0 and time.time() - start_time > timeout
+
+    def finish(status, weight_done):
+        result = {"status": status, "nodes_expanded": nodes_expanded, "time": time.time() - start_time,
+                  "solutions": solutions, "optimal": weight_done == 1 and bool(solutions)}
+        if solutions:
+            result["status"] = "success"
+            result["path"] = best_path
+            result["bound"] = solutions[-1]["bound"]
+        elif status == "timeout":
+            result["time"] = timeout
+        return result
+
+    open_list = [(h_score[start_state] * weights[0], 0, count, start_state)]
+    incons = []
+    best_path = None
+    last_weight = None
+
+    for weight in weights:
+        if time.time() - start_time > timeout:
+            return finish("timeout", last_weight)
+        # Nuovo peso: open + incons, con le chiavi ricalcolate (senza le voci
+        # superate di stati già chiusi, come nella scansione del limite)
+        entries = set(incons)
+        for i, (_, neg_g, _, state) in enumerate(open_list, 1):
+            if expired(i):
+                return finish("timeout", last_weight)
+            if -neg_g == g_score[state]:
+                entries.add(state)
+        open_list = []
+        for i, state in enumerate(entries, 1):
+            if expired(i):
+                return finish("timeout", last_weight)
+            count += 1
+            g = g_score[state]
+            open_list.append((g + weight * h_score[state], -g, count, state))
+        heapq.heapify(open_list)
+        incons = []
+        closed_set = set()
+
+        # ImprovePath: si espande finché il goal non ha la chiave minima
+        while open_list:
+            f, neg_g, _, current = open_list[0]
+            if goal_state is not None and g_score[goal_state] <= f:
+                break
+            heapq.heappop(open_list)
+            if -neg_g != g_score[current] or current in closed_set:
+                continue
+            iterations += 1
+            if iterations % TIMEOUT_CHECK_INTERVAL == 0 and time.time() - start_time > timeout:
+                return finish("timeout", last_weight)
+
+            if current.board == goal:
+                goal_state = current
+                continue
+            closed_set.add(current)
+            nodes_expanded += 1
+            current_g = g_score[current]
+            current_h = h_score[current]
+            parent = came_from[current]
+
+            for neighbor in current.get_neighbors(parent.empty_pos if parent is not None else None):
+                tentative_g = current_g + 1
+                if tentative_g < g_score.get(neighbor, math.inf):
+                    g_score[neighbor] = tentative_g
+                    came_from[neighbor] = current
+                    h = h_score.get(neighbor)
+                    if h is None:
+                        if heuristic is None:
+                            tile = current.board[neighbor.empty_pos]
+                            h = current_h - dist[tile][neighbor.empty_pos] + dist[tile][current.empty_pos]
+                        else:
+                            h = heuristic(neighbor)
+                        h_score[neighbor] = h
+                    if neighbor in closed_set:
+                        incons.append(neighbor)
+                    else:
+                        count += 1
+                        heapq.heappush(open_list, (tentative_g + weight * h, -tentative_g, count, neighbor))
+
+        if goal_state is None:
+            return finish("failure", weight)
+        last_weight = weight
+
+        # Limite di subottimalità: costo / min(g + h) su open e incons
+        length = g_score[goal_state]
+        lower = length
+        scan_expired = False
+        candidates = [incons, (state for _, neg_g, _, state in open_list if -neg_g == g_score[state])]
+        for i, state in enumerate((state for group in candidates for state in group), 1):
+            if expired(i):
+                scan_expired = True
+                break
+            lower = min(lower, g_score[state] + h_score[state])
+        if scan_expired:
+            bound = weight  # scansione interrotta dal timeout: vale comunque il limite del peso
+        else:
+            bound = min(weight, length / lower) if lower else 1.0
+        if not solutions or length < solutions[-1]["length"] or bound < solutions[-1]["bound"]:
+            best_path = reconstruct_path(came_from, goal_state)
+            solution = {"time": time.time() - start_time, "length": length, "bound": bound,
+                        "weight": weight, "nodes_expanded": nodes_expanded}
+            solutions.append(solution)
+            if on_solution is not None:
+                on_solution(dict(solution))
+        if scan_expired:
+            return finish("timeout", last_weight)
+        if bound <= 1:
+            last_weight = 1
+            break
+
+    return finish("success", last_weight)
+
+def solve_weighted_astar(start_state, timeout=60, weight=2.0, heuristic=None):
+    """
+    Weighted A* (f = g + w*h, senza riapertura): soluzione lunga al più
+    w volte l'ottimo. È ARA* con un solo peso; stessi parametri di solve_astar.
+    """
+    return solve_anytime_astar(start_state, timeout=timeout, weights=(weight,), heuristic=heuristic)
+
+
+# --- Algoritmo IDA* ---
+
+# Numero di nodi tra due controlli del timeout (evita time.time() a ogni nodo)
+TIMEOUT_CHECK_INTERVAL = 4096
+
+class _SearchTimeout(Exception):
+    pass
+
+class _BoardView:
+    """Vista minima (board, size) sulla board mutabile, da passare alle euristiche."""
+    __slots__ = ("board", "size")
+
+    def __init__(self, board, size):
+        self.board = board
+        self.size = size
+
+def solve_idastar(start_state, timeout=60, heuristic=None, fsm=False, tt_bits=0):
+    """
+    IDA* (Iterative Deepening A*) con Manhattan incrementale.
+
+    La ricerca è in profondità su un'unica board mutabile (modificata e
+    ripristinata in place) e non torna mai sulla casella appena lasciata dal
+    vuoto. La memoria occupata è solo il cammino corrente, qualunque sia la
+    profondità della soluzione. Restituisce lo stesso dizionario di solve_astar.
+    Con 'heuristic' (es. PatternDatabase) h viene valutata sulla board corrente.
+    Con fsm=True (automa delle mosse) o tt_bits > 0 (tabella delle trasposizioni
+    di 2^tt_bits slot) delega a transposition.solve_idastar_pruned.
+    """
+    if fsm or tt_bits:
+        from transposition import solve_idastar_pruned
+        return solve_idastar_pruned(start_state, timeout=timeout, heuristic=heuristic, fsm=fsm, tt_bits=tt_bits)
+
+    size = start_state.size
+    board = list(start_state.board)
+    view = _BoardView(board, size)
+    heuristic = resolve_heuristic(heuristic, size)
+    goal = list(get_goal_state(size).board)
+    dist = manhattan_table(size)
+    moves = move_table(size)
+
+    # Cammino corrente come sequenza di posizioni del vuoto
+    path = [start_state.empty_pos]
+    nodes_expanded = 0
+    start_time = time.time()
+    found = -1
+
+    def search(g, h, bound, empty, parent):
+        nonlocal nodes_expanded
+        f = g + h
+        if f > bound:
+            return f
+        if h == 0 and board == goal:
+            return found
+
+        nodes_expanded += 1
+        if nodes_expanded % TIMEOUT_CHECK_INTERVAL == 0 and time.time() - start_time > timeout:
+            raise _SearchTimeout()
+
+        minimum = math.inf
+        for new_pos in moves[empty]:
+            if new_pos == parent:
+                continue # Non annulliamo la mossa appena fatta
+            tile = board[new_pos]
+            board[empty], board[new_pos] = tile, 0
+            if heuristic is None:
+                new_h = h - dist[tile][new_pos] + dist[tile][empty]
+            else:
+                new_h = heuristic(view)
+            path.append(new_pos)
+
+            t = search(g + 1, new_h, bound, new_pos, empty)
+            if t == found:
+                return found
+
+            path.pop()
+            board[empty], board[new_pos] = 0, tile
+            if t < minimum:
+                minimum = t
+        return minimum
+
+    start_h = heuristic_manhattan(start_state) if heuristic is None else heuristic(view)
+    bound = start_h
+    try:
+        while True:
+            t = search(0, start_h, bound, start_state.empty_pos, None)
+            if t == found:
+                break
+            if t == math.inf:
+                return {"status": "failure"}
+            bound = t
+    except _SearchTimeout:
+        return {"status": "timeout", "time": timeout, "nodes_expanded": nodes_expanded}
+
+    end_time = time.time()
+    return {
+        "status": "success",
+        "path": replay_blank_moves(start_state, path[1:]),
+        "nodes_expanded": nodes_expanded,
+        "time": end_time - start_time
+    }
+
+def replay_blank_moves(start_state, positions):
+    """Ricostruisce la lista di stati spostando il vuoto nelle posizioni date."""
+    states = [start_state]
+    board = list(start_state.board)
+    empty = start_state.empty_pos
+    for pos in positions:
+        board[empty], board[pos] = board[pos], 0
+        empty = pos
+        states.append(PuzzleState(tuple(board), start_state.size, empty))
+    return states
+
+
+# Board goal per ogni dimensione (costruita una sola volta)
+_GOAL_BOARDS = {}
+
+def goal_board(size):
+    """Tupla goal (1, 2, ..., N^2-1, 0) per una griglia size x size."""
+    board = _GOAL_BOARDS.get(size)
+    if board is None:
+        board = _GOAL_BOARDS[size] = tuple(range(1, size**2)) + (0,)
+    return board
+
 def get_goal_state(size):
     """Restituisce lo stato obiettivo per una griglia size x size."""
     # Goal: 1, 2, ..., N^2-1, 0
-    board = list(range(1, size**2)) + [0]
-    return PuzzleState(tuple(board), size)
+    return PuzzleState(goal_board(size), size)
+
+def is_solvable(board, size):
+    """
+    Verifica in O(n) se la board è risolvibile. Ogni mossa è uno scambio
+    (cambia la parità della permutazione rispetto al goal) e sposta il vuoto di
+    una casella (cambia la parità della sua distanza dalla casella goal): la
+    board è risolvibile se e solo se le due parità coincidono.
+    """
+    n = size * size
+    # sigma[p] = casella goal della tessera che si trova in p
+    sigma = [(val - 1) if val else n - 1 for val in board]
+    seen = [False] * n
+    cycles = 0
+    for p in range(n):
+        if not seen[p]:
+            cycles += 1
+            while not seen[p]:
+                seen[p] = True
+                p = sigma[p]
+    perm_parity = (n - cycles) % 2
 
-def generate_random_instance(size, steps=20):
+    r, c = divmod(list(board).index(0), size)
+    blank_parity = (abs(r - (size - 1)) + abs(c - (size - 1))) % 2
+    return perm_parity == blank_parity
+
+def generate_random_instance(size, steps=20, mode="walk"):
     """
-    Genera un'istanza valida partendo dal goal e applicando 'steps' mosse casuali.
+    Genera un'istanza valida.
+
+    mode="walk": parte dal goal e applica 'steps' mosse casuali senza mai
+    annullare la mossa precedente (altrimenti molti passi si cancellano e
+    l'istanza risulta molto più facile del previsto).
+    mode="uniform": permutazione risolvibile estratta uniformemente ('steps'
+    viene ignorato). Se la permutazione casuale non è risolvibile si scambiano
+    due tessere fisse, il che è una biiezione tra i due insiemi.
     """
+    if mode == "uniform":
+        board = list(range(size * size))
+        random.shuffle(board)
+        if not is_solvable(board, size):
+            i, j = [p for p, val in enumerate(board) if val][:2]
+            board[i], board[j] = board[j], board[i]
+        return PuzzleState(tuple(board), size)
+    elif mode != "walk":
+        raise ValueError(f"mode sconosciuto: {mode}")
+
     current_state = get_goal_state(size)
-    seen_boards = {current_state.board} # Per evitare cicli immediati se possibile
+    previous_pos = None # Posizione del vuoto prima dell'ultima mossa
     
     for _ in range(steps):
-        neighbors = current_state.get_neighbors()
-        # Scegliamo un vicino a caso
+        # Scegliamo un vicino a caso, escluso quello che annulla la mossa appena fatta
+        neighbors = list(current_state.get_neighbors(previous_pos))
         next_state = random.choice(neighbors)
-        
-        # Opzionale: evitiamo di tornare subito indietro allo stato appena visitato
-        # per rendere il mescolamento più efficace
-        if next_state.board in seen_boards and len(neighbors) > 1:
-             # Se possibile, proviamo a sceglierne un altro
-             pass 
-        
+        previous_pos = current_state.empty_pos
         current_state = next_state
-        seen_boards.add(current_state.board)
         
     return current_state
 
+def generate_instance_in_band(size, min_len, max_len, timeout=60, max_attempts=1000):
+    """
+    Genera un'istanza la cui distanza ottima dal goal è in [min_len, max_len].
+    Usa random walk senza ritorni di lunghezza pari al limite superiore e ne
+    misura la distanza ottima con IDA*; se le istanze escono troppo facili la
+    lunghezza della walk viene aumentata gradualmente.
+    Restituisce (stato, lunghezza ottima).
+    """
+    steps = max_len
+    for _ in range(max_attempts):
+        state = generate_random_instance(size, steps)
+        res = solve_idastar(state, timeout=timeout)
+        if res["status"] != "success":
+            continue
+        length = len(res["path"]) - 1
+        if min_len <= length <= max_len:
+            return state, length
+        if length < min_len:
+            steps += 2 # Le walk hanno la parità della distanza: aumentiamo di 2
+    raise RuntimeError(f"Nessuna istanza con lunghezza ottima in [{min_len}, {max_len}]")
 
 
-def run_planner_and_parse(domain_file, problem_file, planner_path="fast-downward.py"):
+
+# --- Solver riutilizzabile ---
+
+SOLVER_ALGORITHMS = {"astar": solve_astar, "idastar": solve_idastar, "bidirectional": solve_bidirectional,
+                     "weighted": solve_weighted_astar, "anytime": solve_anytime_astar}
+
+class Solver:
     """
-    Esegue il planner, cattura l'output e legge il file sas_plan.
+    Solver "caldo" per una dimensione fissa. Board goal, tabella delle mosse
+    e tabella delle distanze stanno nelle cache di modulo (goal_board,
+    move_table, manhattan_table), condivise da tutti i solver: il costruttore
+    si limita a riempirle. L'eventuale euristica costosa (es. pattern
+    database) viene invece risolta una volta qui e passata a ogni solve().
+
+    heuristic: "manhattan" (incrementale), un altro nome del registro di
+    heuristics.py ("linear_conflict", "walking_distance", "pdb") oppure una
+    funzione state -> h.
+    algorithm: "astar", "idastar", "bidirectional" (solo Manhattan),
+    "weighted" o "anytime" (opzioni come weight=/weights= passano al solver).
+    """
+    def __init__(self, size, heuristic="manhattan", algorithm="astar", **solver_options):
+        self.size = size
+        # Riempie le cache di modulo prima della prima ricerca
+        goal_board(size)
+        move_table(size)
+        manhattan_table(size)
+        self.algorithm = algorithm
+        self._solve = SOLVER_ALGORITHMS[algorithm]
+        self.solver_options = solver_options
+
+        # None = Manhattan incrementale già integrata nei solver
+        self.heuristic = resolve_heuristic(heuristic, size)
+        if self.heuristic is not None:
+            if algorithm == "bidirectional":
+                raise ValueError("solve_bidirectional supporta solo Manhattan")
+            self.solver_options["heuristic"] = self.heuristic
+
+    def solve(self, state, timeout=60):
+        if state.size != self.size:
+            raise ValueError(f"Stato {state.size}x{state.size} per un Solver {self.size}x{self.size}")
+        return self._solve(state, timeout=timeout, **self.solver_options)
+
+    def solve_many(self, states, timeout=60):
+        """Generatore: risolve gli stati uno alla volta man mano che arrivano."""
+        for state in states:
+            yield self.solve(state, timeout=timeout)
+
+
+def read_instances(path, size):
     """
+    Legge un file di istanze (una board per riga, tessere separate da spazi o
+    virgole, righe vuote e commenti '#' ignorati) come generatore di stati.
+    """
+    with open(path) as f:
+        for line in f:
+            line = line.split("#")[0].strip()
+            if line:
+                board = [int(tok) for tok in line.replace(",", " ").split()]
+                yield PuzzleState(board, size)
+
+
+# Righe finali dell'output di Fast Downward con le metriche
+TOTAL_TIME_RE = re.compile(r"Total time: (\d+\.\d+)s")
+EXPANDED_RE = re.compile(r"Expanded (\d+) state\(s\)")
+
+def planner_command(domain_file, problem_file, planner_path="fast-downward.py"):
     # Fast Downward preferisce: script -> domain -> problem -> search_options
-    command = [
-        "python3", planner_path, 
-        domain_file, 
-        problem_file,
+    # command = ["python3", planner_path, "--alias", "seq-opt-lmcut", domain_file, problem_file]
+    return [
+        "python3", os.path.abspath(planner_path), 
+        os.path.abspath(domain_file), 
+        os.path.abspath(problem_file),
         "--search", "astar(lmcut())" 
     ]
-    
-    # command = ["python3", planner_path, "--alias", "seq-opt-lmcut", domain_file, problem_file]
+
+def read_sas_plan(plan_file):
+    """Legge (e rimuove) il file sas_plan: lista di azioni senza parentesi."""
+    plan = []
+    with open(plan_file, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith(";"): 
+                continue
+            clean_action = line.replace("(", "").replace(")", "")
+            plan.append(clean_action)
+    os.remove(plan_file)
+    return plan
+
+def run_planner_and_parse(domain_file, problem_file, planner_path="fast-downward.py", timeout=None,
+                          work_dir=None):
+    """
+    Esegue il planner, cattura l'output e legge il file sas_plan.
+    Con 'timeout' (secondi) il planner viene terminato se non finisce in tempo.
+    Con 'work_dir' il planner gira in quella cartella (dove scrive sas_plan e i
+    file intermedi), così più esecuzioni contemporanee non si sovrascrivono.
+    """
+    work_dir = work_dir or "."
+    plan_file = os.path.join(work_dir, "sas_plan")
+    command = planner_command(domain_file, problem_file, planner_path)
     
     print(f"Esecuzione planner: {' '.join(command)} ...")
     
     try:
         # CORREZIONE: Catturiamo anche stderr per il debugging
-        result = subprocess.run(command, capture_output=True, text=True)
-        output = result.stdout
-        error_out = result.stderr
+        # Nuova sessione: al timeout uccidiamo anche i sottoprocessi del planner (translate, search)
+        proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, cwd=work_dir,
+                                start_new_session=True)
+        try:
+            output, error_out = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            proc.communicate()
+            raise
         
         # Se il return code non è 0, qualcosa è andato storto nell'esecuzione
-        if result.returncode != 0:
+        if proc.returncode != 0:
             print("\n!!! ERRORE PLANNER !!!")
             print(error_out) # Stampa dell'errore reale
             return {"status": "error", "reason": "Planner crashed/failed", "details": error_out}
 
         # --- Parsing delle Metriche ---
         # Cerchiamo stringhe tipiche dell'output di Fast Downward
-        time_match = re.search(r"Total time: (\d+\.\d+)s", output)
+        time_match = TOTAL_TIME_RE.search(output)
         search_time = float(time_match.group(1)) if time_match else None
         
-        nodes_match = re.search(r"Expanded (\d+) state\(s\)", output)
+        nodes_match = EXPANDED_RE.search(output)
         expanded_nodes = int(nodes_match.group(1)) if nodes_match else None
         
         # --- Parsing della Soluzione (sas_plan) ---
-        plan = []
         # Controlliamo se esiste il file
-        if os.path.exists("sas_plan"):
-            with open("sas_plan", "r") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith(";"): 
-                        continue
-                    clean_action = line.replace("(", "").replace(")", "")
-                    plan.append(clean_action)
-            
-            os.remove("sas_plan")
+        if os.path.exists(plan_file):
+            plan = read_sas_plan(plan_file)
             return {
                 "status": "success",
                 "plan_length": len(plan),
@@ -244,6 +1195,8 @@ def run_planner_and_parse(domain_file, problem_file, planner_path="fast-downward
             print("\n".join(output.splitlines()[-20:]))
             return {"status": "failure", "reason": "No sas_plan found"}
 
+    except subprocess.TimeoutExpired:
+        return {"status": "timeout", "time": timeout}
     except FileNotFoundError:
         return {"status": "error", "reason": "Planner executable not found"}
     except Exception as e:
@@ -252,14 +1205,10 @@ def run_planner_and_parse(domain_file, problem_file, planner_path="fast-downward
 
 
 
-def generate_pddl(state, problem_name="15puzzle"):
-    """
-    Genera due file: domain.pddl e problem.pddl per l'istanza corrente.
-    """
-    size = state.size
-    
-    # --- 1. Generazione DOMAIN.pddl ---
-    domain_str = """(define (domain n-puzzle)
+# --- Generazione PDDL ---
+
+# Il dominio non dipende dall'istanza né dalla dimensione della griglia
+DOMAIN_PDDL = """(define (domain n-puzzle)
   (:requirements :strips :typing)
   (:types location tile)
   (:predicates 
@@ -276,51 +1225,117 @@ def generate_pddl(state, problem_name="15puzzle"):
   )
 )
 """
-    with open("domain.pddl", "w") as f:
-        f.write(domain_str)
 
-    # --- 2. Generazione PROBLEM.pddl ---
-    # Dobbiamo definire oggetti (tessere e posizioni) e le adiacenze statiche della griglia.
-    
-    objects_str = ""
-    # Locations: pos_x_y
-    for r in range(size):
-        for c in range(size):
-            objects_str += f"pos_{r}_{c} "
-    objects_str += "- location\n"
-    
-    # Tiles: tile_1 ... tile_N^2-1
-    for i in range(1, size**2):
-        objects_str += f"tile_{i} "
-    objects_str += "- tile\n"
+# Blocchi statici del problema (oggetti, adiacenze, goal), uno per dimensione
+_PDDL_STATIC_BLOCKS = {}
+
+# Percorso del file di dominio condiviso tra esecuzioni e processi (scritto una volta)
+_SHARED_DOMAIN_FILE = None
+_SHARED_DOMAIN_LOCK = threading.Lock()
+
+def clear_pddl_cache(size=None):
+    """Dimentica i blocchi statici del problema per 'size' (o per tutte le dimensioni)."""
+    if size is None:
+        _PDDL_STATIC_BLOCKS.clear()
+    else:
+        _PDDL_STATIC_BLOCKS.pop(size, None)
+
+def pddl_static_blocks(size):
+    """
+    Restituisce (objects_str, adjacency_str, goal_str) per una griglia size x size.
+    Sono uguali per tutte le istanze della stessa dimensione: vengono costruiti
+    una sola volta, con un unico join invece di concatenazioni ripetute.
+    """
+    blocks = _PDDL_STATIC_BLOCKS.get(size)
+    if blocks is not None:
+        return blocks
+
+    # Locations: pos_x_y, Tiles: tile_1 ... tile_N^2-1
+    locations = " ".join(f"pos_{r}_{c}" for r in range(size) for c in range(size))
+    tiles = " ".join(f"tile_{i}" for i in range(1, size**2))
+    objects_str = f"{locations} - location\n{tiles} - tile\n"
+
+    # Adiacenze (grafo della griglia)
+    adjacency_str = "".join(
+        f"(adjacent pos_{r}_{c} pos_{nr}_{nc}) \n"
+        for r in range(size) for c in range(size)
+        for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1))
+        if 0 <= nr < size and 0 <= nc < size
+    )
+
+    # Goal standard: la tessera 1 va in (0,0), tessera 2 in (0,1)...
+    goal_str = "".join(
+        f"(at tile_{val} pos_{(val - 1) // size}_{(val - 1) % size}) \n"
+        for val in range(1, size**2)
+    )
+
+    blocks = _PDDL_STATIC_BLOCKS[size] = (objects_str, adjacency_str, goal_str)
+    return blocks
+
+def write_domain_file(domain_file):
+    """
+    Scrive il dominio (scrittura atomica) se il file manca o ha un contenuto
+    diverso da DOMAIN_PDDL, es. un domain.pddl vecchio o di un altro problema.
+    """
+    try:
+        with open(domain_file) as f:
+            current = f.read()
+    except OSError:
+        current = None
+    if current != DOMAIN_PDDL:
+        # Nome distinto per processo e thread: scritture concorrenti non si pestano
+        tmp_file = f"{domain_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_file, "w") as f:
+            f.write(DOMAIN_PDDL)
+        os.replace(tmp_file, domain_file)
+    return domain_file
+
+def shared_domain_file():
+    """
+    File di dominio comune a tutte le esecuzioni (nella cartella temporanea di
+    sistema). Il nome contiene un hash di DOMAIN_PDDL: una versione diversa del
+    dominio usa un altro file invece di riusare quello vecchio. Sicura tra
+    thread (solve_many_with_planner la chiama da un ThreadPoolExecutor).
+    """
+    global _SHARED_DOMAIN_FILE
+    with _SHARED_DOMAIN_LOCK:
+        if _SHARED_DOMAIN_FILE is None:
+            digest = hashlib.sha1(DOMAIN_PDDL.encode()).hexdigest()[:12]
+            _SHARED_DOMAIN_FILE = write_domain_file(
+                os.path.join(tempfile.gettempdir(), f"npuzzle_domain_{digest}.pddl"))
+        elif not os.path.exists(_SHARED_DOMAIN_FILE):
+            write_domain_file(_SHARED_DOMAIN_FILE)
+        return _SHARED_DOMAIN_FILE
+
+def generate_pddl(state, problem_name="15puzzle", out_dir=None, domain_file=None):
+    """
+    Genera due file: domain.pddl e problem.pddl per l'istanza corrente,
+    nella cartella 'out_dir' (default: cartella corrente).
+    Se 'domain_file' è dato (es. shared_domain_file()) il dominio non viene
+    riscritto; altrimenti domain.pddl in out_dir viene scritto se manca o è
+    diverso da DOMAIN_PDDL.
+    """
+    out_dir = out_dir or "."
+    problem_file = os.path.join(out_dir, "problem.pddl")
+    size = state.size
     
-    init_str = ""
-    # Definiamo le adiacenze (grafo della griglia)
-    moves = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    for r in range(size):
-        for c in range(size):
-            for dr, dc in moves:
-                nr, nc = r + dr, c + dc
-                if 0 <= nr < size and 0 <= nc < size:
-                    init_str += f"(adjacent pos_{r}_{c} pos_{nr}_{nc}) \n"
+    # --- 1. DOMAIN.pddl ---
+    if domain_file is None:
+        domain_file = write_domain_file(os.path.join(out_dir, "domain.pddl"))
+
+    # --- 2. Generazione PROBLEM.pddl ---
+    # Oggetti, adiacenze statiche e goal sono precalcolati per dimensione:
+    # per ogni istanza generiamo solo i fatti (at ...) / (empty ...)
+    objects_str, adjacency_str, goal_str = pddl_static_blocks(size)
     
-    # Posizionamento iniziale delle tessere
+    facts = []
     for i, val in enumerate(state.board):
         r, c = divmod(i, size)
         if val == 0:
-            init_str += f"(empty pos_{r}_{c}) \n"
+            facts.append(f"(empty pos_{r}_{c}) \n")
         else:
-            init_str += f"(at tile_{val} pos_{r}_{c}) \n"
-            
-    # Goal state
-    goal_str = ""
-    # Goal standard: 1, 2, 3 ... ordinati
-    target_idx = 0
-    for val in range(1, size**2):
-        # La tessera 1 va in (0,0), tessera 2 in (0,1)...
-        tr, tc = divmod(target_idx, size)
-        goal_str += f"(at tile_{val} pos_{tr}_{tc}) \n"
-        target_idx += 1
+            facts.append(f"(at tile_{val} pos_{r}_{c}) \n")
+    init_str = adjacency_str + "".join(facts)
 
     problem_str = f"""(define (problem {problem_name})
   (:domain n-puzzle)
@@ -335,26 +1350,39 @@ def generate_pddl(state, problem_name="15puzzle"):
   ))
 )
 """
-    with open("problem.pddl", "w") as f:
+    with open(problem_file, "w") as f:
         f.write(problem_str)
     
-    return "domain.pddl", "problem.pddl"
+    return domain_file, problem_file
 
-def solve_with_planner(domain_file, problem_file):
+@contextlib.contextmanager
+def planner_workdir():
     """
-    Esegue un planner esterno. 
+    Cartella temporanea privata per una singola esecuzione del planner
+    (su tmpfs /dev/shm se disponibile). Viene sempre rimossa all'uscita,
+    anche in caso di errore o timeout.
+    """
+    base = "/dev/shm" if os.access("/dev/shm", os.W_OK) else None
+    with tempfile.TemporaryDirectory(prefix="npuzzle_", dir=base) as work_dir:
+        yield work_dir
+
+def solve_with_planner(state, planner_path="fast-downward.py", timeout=None):
+    """
+    Pipeline completa e isolata: genera il PDDL in una cartella privata,
+    esegue il planner lì dentro e rimuove tutto alla fine.
     Nota: Devi avere un planner installato (es. Fast Downward).
-    Qui simuliamo la chiamata.
     """
-    print(f"Eseguendo il planner su {domain_file} e {problem_file}...")
-    
-    # command = ["./fast-downward.py", domain_file, problem_file, "--search", "astar(lmcut())"]
-    
-    # result = subprocess.run(command, capture_output=True, text=True)
-    
-    
-    # return parsed_results
-    pass
+    with planner_workdir() as work_dir:
+        dom, prob = generate_pddl(state, out_dir=work_dir, domain_file=shared_domain_file())
+        return run_planner_and_parse(dom, prob, planner_path=planner_path, timeout=timeout, work_dir=work_dir)
+
+def solve_many_with_planner(states, planner_path="fast-downward.py", timeout=None, max_workers=4):
+    """
+    Esegue fino a 'max_workers' invocazioni del planner contemporaneamente
+    (ognuna nella propria cartella). Restituisce i risultati nell'ordine degli stati.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(lambda s: solve_with_planner(s, planner_path, timeout), states))
 
 
 
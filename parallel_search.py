@@ -0,0 +1,241 @@
+"""
+A* parallelo su più processi (HDA*, Kishimoto et al.): ogni stato appartiene
+al worker indicato da un hash della board, che ne tiene open list, g e padre.
+I figli generati vengono spediti al proprietario a blocchi attraverso code
+multiprocessing; un nodo già visto con g migliore viene riaperto, quindi il
+costo finale è ottimo anche se l'ordine di espansione non è globale.
+
+Terminazione: il processo principale controlla che tutti i worker siano
+inattivi (open vuota o con f >= miglior costo trovato) e che i messaggi
+spediti siano pari a quelli ricevuti, per due letture consecutive uguali.
+"""
+import os
+import zlib
+import time
+import heapq
+import queue
+import multiprocessing
+
+from homework_main import (PuzzleState, goal_board, manhattan_table, move_table, heuristic_manhattan, resolve_heuristic,
+                           _BoardView)
+
+# Nodi espansi tra due letture dei messaggi in arrivo
+EXPAND_BATCH = 64
+
+# Figli accumulati per destinatario prima di spedire un messaggio
+SEND_BATCH = 256
+
+# Intervallo (s) tra due controlli di terminazione del processo principale
+POLL_INTERVAL = 0.005
+
+# Costo "infinito" per il miglior costo condiviso
+NO_SOLUTION = 1 << 30
+
+
+def owner(board, workers):
+    """Worker proprietario di una board (bytes): hash stabile tra processi."""
+    return zlib.crc32(board) % workers
+
+
+def _worker(index, workers, size, inboxes, results, sent, received, idle, best_cost, best_lock, done,
+            heuristic):
+    """Ciclo di ricerca del worker 'index' (eseguito in un processo separato)."""
+    dist = manhattan_table(size)
+    moves = move_table(size)
+    goal = bytes(goal_board(size))
+    inbox = inboxes[index]
+    open_list = []
+    g_score = {}
+    came_from = {}
+    outbox = [[] for _ in range(workers)]
+    expanded = 0
+    generated = 0
+    peak_open = 0
+
+    def send(dest):
+        sent[index] += 1
+        inboxes[dest].put(("nodes", outbox[dest]))
+        outbox[dest] = []
+
+    def receive(nodes):
+        # Nodi (g, h, board, padre) arrivati da un altro worker (o da sé stesso)
+        for g, h, board, parent in nodes:
+            if g < g_score.get(board, NO_SOLUTION):
+                g_score[board] = g
+                came_from[board] = parent
+                if board == goal:
+                    with best_lock:
+                        if g < best_cost.value:
+                            best_cost.value = g
+                elif g + h < best_cost.value:
+                    heapq.heappush(open_list, (g + h, g, board))
+
+    def dispatch(kind, payload):
+        """Gestisce un messaggio; restituisce True alla richiesta di stop."""
+        if kind == "nodes":
+            if not done.value:
+                idle[index] = 0
+                received[index] += 1
+                receive(payload)
+            # Messaggi "nodes" rimasti dopo un timeout: ignorati
+        elif kind == "trace":
+            # Arriva solo a ricerca finita: padre dello stato per ricostruire il cammino
+            results.put(("parent", came_from.get(payload)))
+        else:
+            results.put(("stats", index, expanded, generated, peak_open))
+            # Eventuali messaggi ancora nel buffer non servono più: si esce senza attenderli
+            for other in inboxes:
+                other.cancel_join_thread()
+            return True
+        return False
+
+    while not done.value:
+        # 1. Messaggi in arrivo
+        while True:
+            try:
+                kind, payload = inbox.get_nowait()
+            except queue.Empty:
+                break
+            if dispatch(kind, payload):
+                return
+
+        # 2. Espansione di un blocco di nodi
+        for _ in range(EXPAND_BATCH):
+            if not open_list or open_list[0][0] >= best_cost.value:
+                break
+            f, g, board = heapq.heappop(open_list)
+            if g != g_score[board]:
+                continue  # voce obsoleta: lo stato è stato riaperto con g migliore
+            idle[index] = 0
+            expanded += 1
+            h = f - g
+            empty = board.index(0)
+            parent = came_from[board]
+            parent_pos = parent.index(0) if parent is not None else None
+            child = bytearray(board)
+            local = []
+            for new_pos in moves[empty]:
+                if new_pos == parent_pos:
+                    continue
+                tile = board[new_pos]
+                child[empty], child[new_pos] = tile, 0
+                key = bytes(child)
+                child[empty], child[new_pos] = 0, tile
+                if heuristic is None:
+                    child_h = h - dist[tile][new_pos] + dist[tile][empty]
+                else:
+                    child_h = heuristic(_BoardView(key, size))
+                generated += 1
+                if g + 1 + child_h >= best_cost.value:
+                    continue
+                dest = owner(key, workers)
+                if dest == index:
+                    local.append((g + 1, child_h, key, board))
+                else:
+                    outbox[dest].append((g + 1, child_h, key, board))
+                    if len(outbox[dest]) >= SEND_BATCH:
+                        send(dest)
+            receive(local)
+        if len(open_list) > peak_open:
+            peak_open = len(open_list)
+
+        # 3. Nessun lavoro utile: si spedisce tutto e si attende
+        if not open_list or open_list[0][0] >= best_cost.value:
+            for dest in range(workers):
+                if outbox[dest]:
+                    send(dest)
+            idle[index] = 1
+            try:
+                kind, payload = inbox.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if dispatch(kind, payload):
+                return
+
+    # Ricerca finita: si risponde alle richieste di ricostruzione del cammino fino allo stop
+    while not dispatch(*inbox.get()):
+        pass
+
+
+def solve_hda_star(start_state, timeout=60, workers=None, heuristic=None):
+    """
+    HDA* con 'workers' processi (default: tutti i core). Restituisce lo
+    stesso dizionario di solve_astar più "workers", "expanded_per_worker",
+    "generated" e "messages".
+    """
+    workers = workers or os.cpu_count()
+    size = start_state.size
+    # Tabelle caricate prima del fork: i worker le ereditano già pronte
+    heuristic = resolve_heuristic(heuristic, size)
+    ctx = multiprocessing.get_context("fork")
+    inboxes = [ctx.Queue() for _ in range(workers)]
+    results = ctx.Queue()
+    # Contatori scritti ciascuno da un solo processo: niente lock
+    sent = ctx.RawArray("q", workers + 1)  # l'ultimo è il processo principale
+    received = ctx.RawArray("q", workers)
+    idle = ctx.RawArray("b", workers)
+    best_cost = ctx.RawValue("i", NO_SOLUTION)
+    best_lock = ctx.Lock()
+    done = ctx.RawValue("b", 0)
+
+    procs = [ctx.Process(target=_worker, daemon=True,
+                         args=(i, workers, size, inboxes, results, sent, received, idle,
+                               best_cost, best_lock, done, heuristic))
+             for i in range(workers)]
+    start_time = time.time()
+    for p in procs:
+        p.start()
+
+    start = bytes(start_state.board)
+    start_h = heuristic_manhattan(start_state) if heuristic is None else heuristic(start_state)
+    sent[workers] += 1
+    inboxes[owner(start, workers)].put(("nodes", [(0, start_h, start, None)]))
+
+    status = "failure"
+    previous = None
+    while True:
+        time.sleep(POLL_INTERVAL)
+        if time.time() - start_time > timeout:
+            status = "timeout"
+            break
+        snapshot = (all(idle), sum(sent), sum(received))
+        if snapshot[0] and snapshot[1] == snapshot[2] and snapshot == previous:
+            break
+        previous = snapshot
+    done.value = 1
+    elapsed = time.time() - start_time
+
+    path = None
+    if status != "timeout" and best_cost.value < NO_SOLUTION:
+        status = "success"
+        boards = []
+        board = bytes(goal_board(size))
+        while board is not None:
+            boards.append(board)
+            inboxes[owner(board, workers)].put(("trace", board))
+            _, board = results.get()
+        path = [PuzzleState(b, size) for b in reversed(boards)]
+
+    for inbox in inboxes:
+        inbox.put(("stop", None))
+    per_worker = [None] * workers
+    generated = 0
+    for _ in range(workers):
+        _, index, expanded, gen, _peak = results.get()
+        per_worker[index] = expanded
+        generated += gen
+    for p in procs:
+        p.join()
+
+    result = {
+        "status": status,
+        "nodes_expanded": sum(per_worker),
+        "time": timeout if status == "timeout" else elapsed,
+        "workers": workers,
+        "expanded_per_worker": per_worker,
+        "generated": generated,
+        "messages": sum(sent)
+    }
+    if path is not None:
+        result["path"] = path
+    return result
@@ -0,0 +1,325 @@
+import os
+import sys
+import mmap
+import time
+import argparse
+import threading
+import importlib.util
+
+from homework_main import get_goal_state, move_table
+
+# Cartella in cui vengono salvate le tabelle (riusate tra un run e l'altro)
+PDB_CACHE_DIR = "pdb_cache"
+
+# Partizioni disgiunte delle tessere usate di default per ogni dimensione.
+# 4x4 -> 6-6-3, 5x5 -> 6-6-6-6 (blocchi contigui della griglia goal).
+DEFAULT_PARTITIONS = {
+    3: [(1, 2, 3, 4), (5, 6, 7, 8)],
+    4: [(1, 5, 6, 9, 10, 13), (7, 8, 11, 12, 14, 15), (2, 3, 4)],
+    5: [(1, 2, 3, 6, 7, 8), (4, 5, 9, 10, 14, 15),
+        (11, 12, 13, 16, 17, 18), (19, 20, 21, 22, 23, 24)],
+}
+
+# Valore delle celle non ancora raggiunte durante la costruzione
+UNSET = 255
+
+
+def table_entries(n, k):
+    """Numero di disposizioni di k tessere su n caselle: n! / (n-k)!."""
+    entries = 1
+    for i in range(k):
+        entries *= n - i
+    return entries
+
+def rank_positions(positions, n):
+    """
+    Indice (0 .. n!/(n-k)! - 1) della disposizione 'positions' delle tessere
+    del pattern: ogni posizione viene contata tra le caselle ancora libere.
+    """
+    idx = 0
+    used = 0
+    m = n
+    for p in positions:
+        r = p - (used & ((1 << p) - 1)).bit_count()
+        idx = idx * m + r
+        m -= 1
+        used |= 1 << p
+    return idx
+
+
+def build_pattern_table(size, tiles, verbose=False):
+    """
+    Tabella del pattern (bytearray): con NumPy la BFS è vettoriale
+    (build_pattern_table_numpy), altrimenti si usa quella in Python puro.
+    NumPy è facoltativo: si controlla solo che sia installato.
+    """
+    if importlib.util.find_spec("numpy") is None:
+        return build_pattern_table_python(size, tiles, verbose)
+    return build_pattern_table_numpy(size, tiles, verbose)
+
+
+def build_pattern_table_python(size, tiles, verbose=False):
+    """
+    Costruisce la tabella di un pattern con una BFS all'indietro dal goal.
+
+    Lo stato astratto è (posizioni delle tessere del pattern, posizione del
+    vuoto). Per rendere i pattern additivi contano solo le mosse delle tessere
+    del pattern: gli spostamenti del vuoto su caselle "non pattern" costano 0
+    e vengono esplorati all'interno dello stesso livello. table[idx] è il
+    minimo sulle posizioni del vuoto.
+    """
+    n = size * size
+    k = len(tiles)
+    moves = move_table(size)
+    entries = table_entries(n, k)
+
+    table = bytearray([UNSET]) * entries
+    # Un bit per ogni coppia (disposizione, vuoto) già espansa
+    visited = bytearray((entries * n + 7) // 8)
+
+    # Stato codificato in un intero: vuoto nei bit 0-5, tessera i nei bit 6(i+1)...
+    goal = get_goal_state(size).board
+    start = goal.index(0)
+    for i, t in enumerate(tiles):
+        start |= goal.index(t) << (6 * (i + 1))
+
+    frontier = [start]
+    depth = 0
+    build_start = time.time()
+    while frontier:
+        if verbose:
+            print(f"  profondità {depth:>3}: {len(frontier):>10} stati in frontiera ({time.time() - build_start:.1f}s)",
+                  flush=True)
+        next_frontier = []
+        stack = frontier
+        while stack:
+            code = stack.pop()
+            blank = code & 63
+            positions = [(code >> (6 * (i + 1))) & 63 for i in range(k)]
+            idx = rank_positions(positions, n)
+
+            bit = idx * n + blank
+            if visited[bit >> 3] & (1 << (bit & 7)):
+                continue
+            visited[bit >> 3] |= 1 << (bit & 7)
+            # I livelli sono in ordine di costo: la prima volta è il minimo
+            if table[idx] == UNSET:
+                table[idx] = depth
+
+            for q in moves[blank]:
+                base = code & ~63
+                if q in positions:
+                    # La tessera del pattern in q scivola nel vuoto: costo 1
+                    i = positions.index(q)
+                    shift = 6 * (i + 1)
+                    next_frontier.append((base & ~(63 << shift)) | (blank << shift) | q)
+                else:
+                    # Si muove una tessera fuori dal pattern: costo 0
+                    stack.append(base | q)
+        frontier = next_frontier
+        depth += 1
+    return table
+
+
+def build_pattern_table_numpy(size, tiles, verbose=False, chunk=1 << 20):
+    """
+    Stessa BFS di build_pattern_table_python su array NumPy: ogni livello è un
+    array di codici rango * n + vuoto (rango di rank_positions) e le mosse di
+    tutti gli stati di un blocco si calcolano insieme. Le mosse a costo 0 si
+    chiudono nello stesso livello ripetendo l'espansione sui soli stati nuovi.
+    Memoria: tabella da n!/(n-k)! byte più un bit per (disposizione, vuoto).
+    """
+    import numpy as np
+
+    n = size * size
+    k = len(tiles)
+    entries = table_entries(n, k)
+    # Peso della cifra i del rango (basi n, n-1, ..., n-k+1)
+    weights = [table_entries(n - i - 1, k - i - 1) for i in range(k)]
+    radices = [n - i for i in range(k)]
+    neighbours = np.full((n, 4), -1, dtype=np.int64)
+    for pos, targets in enumerate(move_table(size)):
+        neighbours[pos, :len(targets)] = targets
+
+    table = np.full(entries, UNSET, dtype=np.uint8)
+    visited = np.zeros((entries * n + 7) // 8, dtype=np.uint8)
+
+    def encode(P):
+        # Come rank_positions: ogni posizione contata tra le caselle ancora libere
+        idx = np.zeros(len(P), dtype=np.int64)
+        for i in range(k):
+            r = P[:, i].astype(np.int64)
+            for j in range(i):
+                r -= P[:, j] < P[:, i]
+            idx += r * weights[i]
+        return idx
+
+    def decode(idx):
+        """Posizioni delle tessere (righe di P) e maschera delle caselle occupate."""
+        P = np.empty((len(idx), k), dtype=np.int64)
+        mask = np.zeros(len(idx), dtype=np.int64)
+        for i in range(k):
+            # Casella numero 'digit' tra quelle libere: si scavalcano le occupate in ordine crescente
+            p = (idx // weights[i]) % radices[i]
+            for used in np.sort(P[:, :i], axis=1).T:
+                p += used <= p
+            P[:, i] = p
+            mask |= 1 << p
+        return P, mask
+
+    def not_visited(codes):
+        return codes[((visited[codes >> 3] >> (codes & 7).astype(np.uint8)) & 1) == 0]
+
+    def unvisited(codes):
+        # Senza duplicati: ordinamento + confronto tra vicini (più veloce di np.unique)
+        codes = not_visited(codes)
+        if not codes.size:
+            return codes
+        codes.sort()
+        return codes[np.concatenate(([True], codes[1:] != codes[:-1]))]
+
+    goal = get_goal_state(size).board
+    positions = np.array([[goal.index(t) for t in tiles]], dtype=np.int64)
+    frontier = encode(positions) * n + goal.index(0)
+    depth = 0
+    build_start = time.time()
+    while frontier.size:
+        next_parts = []
+        current = frontier
+        while current.size:
+            current = unvisited(current)
+            if not current.size:
+                break
+            np.bitwise_or.at(visited, current >> 3, (1 << (current & 7)).astype(np.uint8))
+            ranks = current // n
+            # I livelli sono in ordine di costo: la prima volta è il minimo
+            ranks = ranks[table[ranks] == UNSET]
+            table[ranks] = depth
+
+            zero_parts = []
+            for lo in range(0, len(current), chunk):
+                codes = current[lo:lo + chunk]
+                idx, blank = codes // n, codes % n
+                P, mask = decode(idx)
+                for d in range(4):
+                    q = neighbours[blank, d]
+                    valid = q >= 0
+                    pattern = ((mask >> np.maximum(q, 0)) & 1).astype(bool)
+                    # Si muove una tessera fuori dal pattern: costo 0, stessa disposizione
+                    free = valid & ~pattern
+                    zero_parts.append(idx[free] * n + q[free])
+                    # La tessera del pattern in q scivola nel vuoto: costo 1
+                    moved = valid & pattern
+                    P1 = P[moved]
+                    q1 = q[moved]
+                    P1[P1 == q1[:, None]] = blank[moved]
+                    next_parts.append(not_visited(encode(P1) * n + q1))
+            current = np.concatenate(zero_parts)
+        if verbose:
+            reached = entries - int(np.count_nonzero(table == UNSET))
+            print(f"  profondità {depth:>3}: {reached:>12}/{entries} disposizioni ({time.time() - build_start:.1f}s)",
+                  flush=True)
+        frontier = unvisited(np.concatenate(next_parts)) if next_parts else np.empty(0, dtype=np.int64)
+        depth += 1
+    return bytearray(table.tobytes())
+
+
+def pattern_file(size, tiles, cache_dir=PDB_CACHE_DIR):
+    name = "-".join(str(t) for t in tiles)
+    return os.path.join(cache_dir, f"pdb_{size}x{size}_{name}.bin")
+
+def build_memory_bytes(size, k):
+    """Memoria minima della costruzione: tabella (1 byte) + bitmap dei visitati (1 bit per vuoto)."""
+    n = size * size
+    entries = table_entries(n, k)
+    return entries + entries * n // 8
+
+def build_pattern_file(size, tiles, cache_dir=PDB_CACHE_DIR, verbose=False):
+    """Costruisce la tabella del pattern e la salva in pattern_file (sovrascrivendola)."""
+    path = pattern_file(size, tiles, cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    table = build_pattern_table(size, tiles, verbose)
+    # Scrittura atomica: un worker parallelo non legge mai un file a metà
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(table)
+    os.replace(tmp_path, path)
+    return path
+
+def load_pattern_table(size, tiles, cache_dir=PDB_CACHE_DIR):
+    """
+    Restituisce la tabella del pattern mappata in memoria (mmap in sola
+    lettura), costruendola e salvandola su disco solo se non esiste ancora.
+    Processi diversi che caricano lo stesso file condividono le pagine.
+    """
+    path = pattern_file(size, tiles, cache_dir)
+    if not os.path.exists(path):
+        print(f"Pattern {tiles} ({size}x{size}) non in {cache_dir}: costruzione in corso, "
+              f"tabella e bitmap ~{build_memory_bytes(size, len(tiles)) / 2**20:.1f} MB più la frontiera "
+              f"(si può fare prima con: python3 pattern_db.py build {size})", flush=True)
+        build_pattern_file(size, tiles, cache_dir)
+
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class PatternDatabase:
+    """
+    Euristica additiva a pattern disgiunti: somma dei valori delle tabelle dei
+    singoli pattern. Si usa come qualsiasi euristica (pdb(state)) e si può
+    passare a solve_astar / solve_idastar tramite il parametro 'heuristic'.
+    """
+    def __init__(self, size, partition=None, cache_dir=PDB_CACHE_DIR):
+        self.size = size
+        self.partition = [tuple(p) for p in (partition or DEFAULT_PARTITIONS[size])]
+        start = time.time()
+        self.tables = [load_pattern_table(size, tiles, cache_dir) for tiles in self.partition]
+        self.load_time = time.time() - start
+
+    def evaluate(self, board):
+        n = len(board)
+        where = [0] * n
+        for i, val in enumerate(board):
+            where[val] = i
+
+        total = 0
+        for tiles, table in zip(self.partition, self.tables):
+            total += table[rank_positions([where[t] for t in tiles], n)]
+        return total
+
+    def __call__(self, state):
+        return self.evaluate(state.board)
+
+    def table_bytes(self):
+        return sum(len(table) for table in self.tables)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Costruzione esplicita dei pattern database, con avanzamento")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="costruisce (o ricostruisce) le tabelle di una dimensione")
+    build.add_argument("size", type=int)
+    build.add_argument("--tiles", action="append", default=None,
+                       help="pattern come elenco di tessere (es. 1,2,3), ripetibile; default: DEFAULT_PARTITIONS")
+    build.add_argument("--cache-dir", default=PDB_CACHE_DIR)
+    build.add_argument("--force", action="store_true", help="ricostruisce anche le tabelle già su disco")
+    args = parser.parse_args(argv[1:])
+
+    partition = ([tuple(int(t) for t in tiles.split(",")) for tiles in args.tiles] if args.tiles
+                 else DEFAULT_PARTITIONS[args.size])
+    for tiles in partition:
+        path = pattern_file(args.size, tiles, args.cache_dir)
+        if os.path.exists(path) and not args.force:
+            print(f"{path}: già presente")
+            continue
+        entries = table_entries(args.size * args.size, len(tiles))
+        print(f"{path}: {entries} disposizioni, tabella e bitmap ~{build_memory_bytes(args.size, len(tiles)) / 2**20:.1f} MB "
+              f"(più la frontiera della BFS)")
+        start = time.time()
+        build_pattern_file(args.size, tiles, args.cache_dir, verbose=True)
+        print(f"{path}: costruito in {time.time() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,263 @@
+"""
+Suite di benchmark riproducibile per i punti caldi dei solver, separata dallo
+sweep di benchmark.py (niente planner, seed fissi):
+
+- micro: ns per chiamata di get_neighbors, euristiche, open list, ranking...
+  misurati con timeit su input fissi;
+- macro: solve_astar su un corpus fisso di istanze per N (perf_corpus.json)
+  con lunghezze ottime note, ogni run in un processo separato per misurare
+  il picco di RSS; si riportano nodi/s e tempo.
+
+Ogni metrica ha mediana, media e intervallo di confidenza al 95% sulle
+ripetizioni. 'compare' segnala le regressioni rispetto a un file baseline:
+
+    python3 perf_suite.py run --save-baseline
+    python3 perf_suite.py run --out current.json
+    python3 perf_suite.py compare perf_baseline.json current.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import timeit
+import platform
+import argparse
+import resource
+import statistics
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from homework_main import (PuzzleState, PackedPuzzleState, HeapOpenList, BucketOpenList, generate_random_instance,
+                           heuristic_manhattan, heuristic_linear_conflict, pack_board, solve_astar, solve_idastar)
+from compact_store import rank_permutation
+
+CORPUS_FILE = "perf_corpus.json"
+BASELINE_FILE = "perf_baseline.json"
+
+# Corpus: (N, istanze, passi del random walk), generato con SEED
+CORPUS_SPEC = [(3, 12, 40), (4, 8, 36)]
+SEED = 12345
+
+# Ripetizioni per le misure micro e macro
+MICRO_REPEATS = 15
+MACRO_REPEATS = 5
+
+# Variazione relativa oltre la quale (con intervalli disgiunti) si segnala una regressione
+DEFAULT_THRESHOLD = 0.10
+
+# Quantili t di Student al 97.5% per gradi di libertà 1..30
+_T_975 = [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+          2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+          2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042]
+
+
+def summarize(samples, better):
+    """Mediana, media e intervallo di confidenza al 95% (t di Student) dei campioni."""
+    mean = statistics.fmean(samples)
+    if len(samples) > 1:
+        t = _T_975[len(samples) - 2] if len(samples) <= 31 else 1.96
+        half = t * statistics.stdev(samples) / len(samples) ** 0.5
+    else:
+        half = 0.0
+    return {"median": statistics.median(samples), "mean": mean, "ci95": [mean - half, mean + half],
+            "samples": samples, "better": better}
+
+
+# --- Corpus ---
+
+def build_corpus(spec=CORPUS_SPEC, seed=SEED):
+    """Istanze fisse per N con la loro lunghezza ottima (calcolata con IDA*)."""
+    state = random.getstate()
+    random.seed(seed)
+    corpus = {}
+    try:
+        for size, count, steps in spec:
+            entries = []
+            for _ in range(count):
+                instance = generate_random_instance(size, steps)
+                res = solve_idastar(instance, timeout=600)
+                entries.append({"board": list(instance.board), "optimal": len(res["path"]) - 1})
+            corpus[str(size)] = entries
+    finally:
+        random.setstate(state)
+    return corpus
+
+def load_corpus(path=CORPUS_FILE):
+    if not os.path.exists(path):
+        corpus = build_corpus()
+        with open(path, "w") as f:
+            json.dump(corpus, f, indent=1)
+    with open(path) as f:
+        return json.load(f)
+
+
+# --- Micro-benchmark ---
+
+def _micro_cases(corpus):
+    """(nome, funzione senza argomenti) per ogni punto caldo, su input fissi."""
+    board = corpus["4"][0]["board"]
+    state = PuzzleState(board, 4)
+    packed = PackedPuzzleState.from_state(state)
+    parent_pos = state.empty_pos - 1 if state.empty_pos % 4 else state.empty_pos + 1
+
+    rng = random.Random(SEED)
+    keys = [rng.randrange(40, 80) for _ in range(1000)]
+
+    def open_list_cycle(cls):
+        def run():
+            open_list = cls()
+            for k in keys:
+                open_list.push(k, k >> 1, state)
+            while open_list:
+                open_list.pop()
+        return run
+
+    return [
+        ("get_neighbors", lambda: list(state.get_neighbors())),
+        ("get_neighbors_pruned", lambda: list(state.get_neighbors(parent_pos))),
+        ("packed_get_neighbors", lambda: list(packed.get_neighbors())),
+        ("heuristic_manhattan", lambda: heuristic_manhattan(state)),
+        ("heuristic_linear_conflict", lambda: heuristic_linear_conflict(state)),
+        ("heap_push_pop_1000", open_list_cycle(HeapOpenList)),
+        ("bucket_push_pop_1000", open_list_cycle(BucketOpenList)),
+        ("rank_permutation", lambda: rank_permutation(board)),
+        ("pack_board", lambda: pack_board(board, 4)),
+        ("state_hash", lambda: hash(PuzzleState(board, 4, state.empty_pos))),
+    ]
+
+def run_micro(corpus, repeats=MICRO_REPEATS, only=None):
+    results = {}
+    for name, func in _micro_cases(corpus):
+        if only and name not in only:
+            continue
+        timer = timeit.Timer(func)
+        number, _ = timer.autorange()  # chiamate per campione (almeno 0.2s)
+        samples = [t / number * 1e9 for t in timer.repeat(repeat=repeats, number=number)]
+        results[name] = dict(summarize(samples, "lower"), unit="ns/op")
+        print(f"  {name:<28} {results[name]['median']:>12.1f} ns/op")
+    return results
+
+
+# --- Macro-benchmark ---
+
+def _macro_run(size, entries):
+    """Risolve il corpus di una dimensione in un processo nuovo: (tempo, nodi, picco RSS MB)."""
+    nodes = 0
+    start_time = time.perf_counter()
+    for entry in entries:
+        res = solve_astar(PuzzleState(entry["board"], size), timeout=600)
+        if res["status"] != "success" or len(res["path"]) - 1 != entry["optimal"]:
+            raise RuntimeError(f"Risultato errato su {entry['board']}: {res['status']}")
+        nodes += res["nodes_expanded"]
+    elapsed = time.perf_counter() - start_time
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Linux: KB
+    return elapsed, nodes, peak_rss_mb
+
+def run_macro(corpus, repeats=MACRO_REPEATS):
+    results = {}
+    ctx = multiprocessing.get_context("spawn")  # processo pulito: il picco di RSS è solo del run
+    for size, entries in corpus.items():
+        times, rates, rss = [], [], []
+        for _ in range(repeats):
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                elapsed, nodes, peak = pool.submit(_macro_run, int(size), entries).result()
+            times.append(elapsed)
+            rates.append(nodes / elapsed)
+            rss.append(peak)
+        results[f"astar_N{size}_nodes_per_sec"] = dict(summarize(rates, "higher"), unit="nodes/s")
+        results[f"astar_N{size}_time"] = dict(summarize(times, "lower"), unit="s")
+        results[f"astar_N{size}_peak_rss"] = dict(summarize(rss, "lower"), unit="MB")
+        print(f"  N={size}: {statistics.median(rates):>10.0f} nodi/s | {statistics.median(times):7.3f}s | "
+              f"picco RSS {max(rss):7.1f} MB")
+    return results
+
+
+def run_suite(repeats=MICRO_REPEATS, macro_repeats=MACRO_REPEATS, skip_macro=False):
+    corpus = load_corpus()
+    print("Micro-benchmark:")
+    metrics = run_micro(corpus, repeats)
+    if not skip_macro:
+        print("Macro-benchmark (solve_astar sul corpus):")
+        metrics.update(run_macro(corpus, macro_repeats))
+    return {
+        "meta": {"python": platform.python_version(), "machine": platform.machine(),
+                 "date": time.strftime("%Y-%m-%d %H:%M:%S"), "seed": SEED},
+        "metrics": metrics
+    }
+
+
+# --- Confronto ---
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Confronta due risultati metrica per metrica. Regressione: la mediana
+    peggiora più di 'threshold' e gli intervalli di confidenza non si
+    sovrappongono. Restituisce la lista delle metriche in regressione.
+    """
+    regressions = []
+    print(f"{'Metrica':<30} {'Baseline':>12} {'Attuale':>12} {'Var.':>8}")
+    for name, cur in current["metrics"].items():
+        base = baseline["metrics"].get(name)
+        if base is None:
+            continue
+        change = (cur["median"] - base["median"]) / base["median"]
+        worse = change if cur["better"] == "lower" else -change
+        disjoint = cur["ci95"][0] > base["ci95"][1] or cur["ci95"][1] < base["ci95"][0]
+        flag = ""
+        if abs(worse) > threshold and not disjoint:
+            flag = "  (non significativo)"
+        elif worse > threshold:
+            flag = "  REGRESSIONE"
+            regressions.append(name)
+        elif -worse > threshold:
+            flag = "  migliorato"
+        print(f"{name:<30} {base['median']:>12.4g} {cur['median']:>12.4g} {change:>+7.1%}{flag}")
+    return regressions
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Micro/macro benchmark riproducibili dei solver")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="esegue la suite")
+    run.add_argument("--out", default=None, help="file JSON dei risultati")
+    run.add_argument("--save-baseline", action="store_true", help=f"salva i risultati in {BASELINE_FILE}")
+    run.add_argument("--repeats", type=int, default=MICRO_REPEATS)
+    run.add_argument("--macro-repeats", type=int, default=MACRO_REPEATS)
+    run.add_argument("--skip-macro", action="store_true")
+    run.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    cmp_parser = sub.add_parser("compare", help="confronta due file di risultati")
+    cmp_parser.add_argument("baseline", nargs="?", default=BASELINE_FILE)
+    cmp_parser.add_argument("current")
+    cmp_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    sub.add_parser("corpus", help=f"rigenera {CORPUS_FILE}")
+    args = parser.parse_args(argv[1:])
+
+    if args.command == "corpus":
+        with open(CORPUS_FILE, "w") as f:
+            json.dump(build_corpus(), f, indent=1)
+        return 0
+
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        return 1 if compare(baseline, current, args.threshold) else 0
+
+    results = run_suite(args.repeats, args.macro_repeats, args.skip_macro)
+    out = BASELINE_FILE if args.save_baseline else args.out
+    if out:
+        with open(out, "w") as f:
+            json.dump(results, f, indent=1)
+        print(f"Risultati salvati in {out}")
+    # Senza --save-baseline si confronta subito con la baseline, se c'è
+    if not args.save_baseline and os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE) as f:
+            baseline = json.load(f)
+        return 1 if compare(baseline, results, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,142 @@
+"""
+Esecuzione non bloccante di Fast Downward con asyncio: l'output viene letto
+riga per riga mentre il planner gira (le metriche sono disponibili subito,
+senza tenere in memoria tutto lo stdout), con limiti di tempo e di memoria che
+terminano il processo, e più planner in parallelo sotto un semaforo.
+"""
+import os
+import re
+import signal
+import time
+import asyncio
+import resource
+from collections import deque
+
+from homework_main import (generate_pddl, planner_command, planner_workdir, read_sas_plan,
+                           shared_domain_file, TOTAL_TIME_RE, EXPANDED_RE)
+
+# Righe di avanzamento di Fast Downward, es. "[t=0.5s, 1234 KB] ... 812 expanded"
+PROGRESS_EXPANDED_RE = re.compile(r"(\d+) expanded")
+
+# Exit code di Fast Downward per memoria esaurita (translate, search, search+tempo)
+OUT_OF_MEMORY_CODES = (20, 22, 24)
+
+# Righe finali conservate per la diagnosi in caso di errore
+TAIL_LINES = 20
+
+
+def _limit_memory(memory_limit_mb):
+    """preexec_fn per il figlio: limite sullo spazio di indirizzamento."""
+    def apply():
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    return apply
+
+
+async def run_planner_async(domain_file, problem_file, planner_path="fast-downward.py", timeout=None,
+                            memory_limit_mb=None, work_dir=None, on_progress=None):
+    """
+    Versione asincrona di run_planner_and_parse. Ogni riga di output viene
+    analizzata appena arriva: 'on_progress(metrics)' (opzionale) riceve il
+    dizionario aggiornato {"expanded_nodes", "time", "elapsed"}. Allo scadere
+    di 'timeout' l'intero gruppo di processi del planner viene ucciso.
+    """
+    work_dir = work_dir or "."
+    plan_file = os.path.join(work_dir, "sas_plan")
+    command = planner_command(domain_file, problem_file, planner_path)
+    metrics = {"expanded_nodes": None, "time": None, "elapsed": 0.0}
+    tail = deque(maxlen=TAIL_LINES)
+    start_time = time.time()
+
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *command, cwd=work_dir,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+            # Nuova sessione: al timeout uccidiamo anche i sottoprocessi del planner
+            start_new_session=True,
+            preexec_fn=_limit_memory(memory_limit_mb) if memory_limit_mb else None)
+    except FileNotFoundError:
+        return {"status": "error", "reason": "Planner executable not found"}
+
+    async def consume():
+        async for raw in proc.stdout:
+            line = raw.decode(errors="replace").rstrip()
+            tail.append(line)
+            updated = False
+            match = EXPANDED_RE.search(line) or PROGRESS_EXPANDED_RE.search(line)
+            if match:
+                metrics["expanded_nodes"] = int(match.group(1))
+                updated = True
+            match = TOTAL_TIME_RE.search(line)
+            if match:
+                metrics["time"] = float(match.group(1))
+                updated = True
+            if updated and on_progress is not None:
+                metrics["elapsed"] = time.time() - start_time
+                on_progress(dict(metrics))
+        return await proc.wait()
+
+    try:
+        returncode = await asyncio.wait_for(consume(), timeout)
+    except asyncio.TimeoutError:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        await proc.wait()
+        if os.path.exists(plan_file):
+            os.remove(plan_file)
+        return {"status": "timeout", "time": timeout, "expanded_nodes": metrics["expanded_nodes"]}
+
+    if returncode in OUT_OF_MEMORY_CODES:
+        return {"status": "memory", "reason": "Planner out of memory", "details": "\n".join(tail)}
+    if returncode != 0:
+        return {"status": "error", "reason": "Planner crashed/failed", "details": "\n".join(tail)}
+
+    if not os.path.exists(plan_file):
+        return {"status": "failure", "reason": "No sas_plan found", "details": "\n".join(tail)}
+
+    plan = read_sas_plan(plan_file)
+    return {
+        "status": "success",
+        "plan_length": len(plan),
+        "plan": plan,
+        "time": metrics["time"],
+        "expanded_nodes": metrics["expanded_nodes"]
+    }
+
+
+async def solve_with_planner_async(state, planner_path="fast-downward.py", timeout=None,
+                                   memory_limit_mb=None, on_progress=None):
+    """Pipeline completa (PDDL + planner) in una cartella privata, versione asincrona."""
+    with planner_workdir() as work_dir:
+        dom, prob = generate_pddl(state, out_dir=work_dir, domain_file=shared_domain_file())
+        return await run_planner_async(dom, prob, planner_path=planner_path, timeout=timeout,
+                                       memory_limit_mb=memory_limit_mb, work_dir=work_dir,
+                                       on_progress=on_progress)
+
+
+async def run_planner_jobs(states, planner_path="fast-downward.py", max_concurrent=4, timeout=None,
+                           memory_limit_mb=None, on_progress=None):
+    """
+    Risolve tutti gli stati con al massimo 'max_concurrent' planner attivi
+    insieme. on_progress(i, metrics) riceve anche l'indice dello stato.
+    Restituisce i risultati nell'ordine degli stati.
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def job(i, state):
+        callback = None
+        if on_progress is not None:
+            callback = lambda metrics: on_progress(i, metrics)
+        async with semaphore:
+            return await solve_with_planner_async(state, planner_path, timeout, memory_limit_mb, callback)
+
+    return await asyncio.gather(*(job(i, s) for i, s in enumerate(states)))
+
+
+def solve_many_async(states, planner_path="fast-downward.py", max_concurrent=4, timeout=None,
+                     memory_limit_mb=None, on_progress=None):
+    """Wrapper sincrono di run_planner_jobs."""
+    return asyncio.run(run_planner_jobs(states, planner_path, max_concurrent, timeout,
+                                        memory_limit_mb, on_progress))
@@ -1,10 +1,16 @@
+import time
+import argparse
 import pandas as pd
 import matplotlib.pyplot as plt
 from datetime import datetime # Import necessario
 
-def plot_benchmark():
+from results_store import ResultAggregator
+
+def plot_benchmark(only_changed=False):
+    # Solo le righe nuove del CSV vengono lette: le medie sono salvate accanto al file
     try:
-        df = pd.read_csv("benchmark_results.csv")
+        aggregator = ResultAggregator("benchmark_results.csv")
+        changed = aggregator.update()
     except FileNotFoundError:
         print("Il file benchmark_results.csv non esiste!")
         return
@@ -13,16 +19,18 @@ def plot_benchmark():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
     datasets = {
-        "8-Puzzle (3x3)": df[df["N"] == 3],
-        "15-Puzzle (4x4)": df[df["N"] == 4],
-        "24-Puzzle (5x5)": df[df["N"] == 5] # Nel caso lo aggiungessi
+        "8-Puzzle (3x3)": 3,
+        "15-Puzzle (4x4)": 4,
+        "24-Puzzle (5x5)": 5 # Nel caso lo aggiungessi
     }
 
-    for title, data in datasets.items():
-        if data.empty:
+    for title, N in datasets.items():
+        if only_changed and N not in changed:
             continue
             
-        grouped = data.groupby("Shuffle_Steps").mean(numeric_only=True)
+        grouped = pd.DataFrame.from_dict(aggregator.means(N), orient="index")
+        if grouped.empty:
+            continue
         
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
         fig.suptitle(f'Confronto Prestazioni: {title}', fontsize=16)
@@ -56,7 +64,16 @@ def plot_benchmark():
         
         plt.savefig(filename)
         print(f"Grafico salvato come: {filename}")
+        plt.close(fig)
         # plt.show() # Decommenta se vuoi vederli a schermo
 
 if __name__ == "__main__":
-    plot_benchmark()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Grafici dai risultati del benchmark")
+    parser.add_argument("--watch", type=float, default=None,
+                        help="Ogni quanti secondi ridisegnare i grafici con dati nuovi (benchmark in corso)")
+    args = parser.parse_args()
+
+    plot_benchmark()
+    while args.watch:
+        time.sleep(args.watch)
+        plot_benchmark(only_changed=True)
\ No newline at end of file
@@ -0,0 +1,194 @@
+"""
+Risultati del benchmark in streaming: ogni riga viene aggiunta in coda al CSV
+e scritta su disco subito (flush + fsync), con accanto un manifest JSON del
+run. Un benchmark interrotto riprende saltando le celle già presenti.
+
+ResultAggregator legge solo i byte aggiunti dall'ultima volta e tiene medie
+incrementali per (N, Shuffle_Steps), salvate in un file di stato: i grafici
+si possono rigenerare mentre il benchmark è ancora in corso, a costo O(righe nuove).
+Lo stato ricorda l'identità del run (inizio nel manifest): se il CSV viene
+ricominciato le medie ripartono da zero.
+"""
+import os
+import io
+import csv
+import json
+import time
+
+
+def manifest_path(csv_path):
+    return csv_path + ".manifest.json"
+
+def aggregate_path(csv_path):
+    return csv_path + ".agg.json"
+
+def _write_json(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+def _format_row(row):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(row)
+    return buffer.getvalue().encode()
+
+
+def run_identity(csv_path):
+    """Identità del run che sta scrivendo il CSV: l'istante di inizio nel manifest (None se manca)."""
+    try:
+        with open(manifest_path(csv_path)) as f:
+            return json.load(f).get("started")
+    except (OSError, ValueError):
+        return None
+
+
+class ResultStore:
+    """
+    CSV append-only con manifest. Con resume=True un file esistente con la
+    stessa intestazione viene ripreso (una riga troncata da un crash viene
+    scartata); un file con colonne diverse viene spostato in una copia di
+    backup e si ricomincia. Con resume=False si ricomincia da capo.
+    """
+    def __init__(self, path, header, config=None, resume=True):
+        self.path = path
+        self.header = list(header)
+        self.rows = []
+
+        if not (resume and os.path.exists(path) and os.path.getsize(path) > 0 and self._recover()):
+            with open(path, "wb") as f:
+                f.write(_format_row(self.header))
+        self.file = open(path, "ab")
+
+        manifest = {"header": self.header, "config": config or {}, "started": time.time()}
+        if resume and os.path.exists(manifest_path(path)):
+            with open(manifest_path(path)) as f:
+                previous = json.load(f)
+            manifest["started"] = previous.get("started", manifest["started"])
+            manifest["resumed"] = previous.get("resumed", 0) + 1
+        self.manifest = manifest
+        self._save_manifest()
+
+    def _recover(self):
+        """Riprende il CSV esistente; False se aveva altre colonne (ed è stato messo da parte)."""
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            header = next(csv.reader([data.split(b"\n", 1)[0].decode()]), None)
+            if header != self.header:
+                self._backup()
+                return False
+            # Ultima riga senza '\n': scritta a metà prima di un'interruzione
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                f.truncate(end)
+        reader = csv.reader(io.StringIO(data[:end].decode()))
+        next(reader)
+        self.rows = list(reader)
+        return True
+
+    def _backup(self):
+        """Sposta CSV e manifest in <path>.<data>.bak (es. risultati di una versione precedente)."""
+        backup = f"{self.path}.{time.strftime('%Y%m%d_%H%M%S')}.bak"
+        os.replace(self.path, backup)
+        if os.path.exists(manifest_path(self.path)):
+            os.replace(manifest_path(self.path), manifest_path(backup))
+        print(f"{self.path} ha colonne diverse da quelle attese: spostato in {backup}, si ricomincia")
+
+    def _save_manifest(self):
+        self.manifest["rows"] = len(self.rows)
+        self.manifest["updated"] = time.time()
+        _write_json(manifest_path(self.path), self.manifest)
+
+    def completed(self, key_columns=3):
+        """Chiavi (prime 'key_columns' colonne, come stringhe) delle righe già scritte."""
+        return {tuple(row[:key_columns]) for row in self.rows}
+
+    def append(self, row):
+        """Aggiunge una riga e la rende persistente prima di restituire."""
+        self.file.write(_format_row(row))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.rows.append([str(value) for value in row])
+        self._save_manifest()
+
+    def close(self):
+        self.manifest["finished"] = time.time()
+        self._save_manifest()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.file.close()
+
+
+class ResultAggregator:
+    """
+    Medie per (N, Shuffle_Steps) delle colonne numeriche del CSV, aggiornate
+    leggendo solo le righe nuove. Lo stato (offset letto, somme e conteggi)
+    resta su disco tra un'esecuzione e l'altra dello script dei grafici.
+    """
+    def __init__(self, csv_path):
+        self.csv_path = csv_path
+        self.state_path = aggregate_path(csv_path)
+        self.state = None
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                self.state = json.load(f)
+        if self.state is None:
+            self._reset()
+
+    def _reset(self):
+        self.state = {"offset": 0, "header": None, "run": run_identity(self.csv_path), "groups": {}}
+
+    def update(self):
+        """Legge le righe nuove; restituisce l'insieme degli N con dati cambiati."""
+        size = os.path.getsize(self.csv_path)
+        if size < self.state["offset"] or run_identity(self.csv_path) != self.state.get("run"):
+            self._reset()  # il CSV è stato ricominciato (anche se nel frattempo è cresciuto oltre l'offset)
+        with open(self.csv_path, "rb") as f:
+            if self.state["offset"] == 0:
+                first = f.readline()
+                header = next(csv.reader([first.decode()]))
+                self.state["header"] = header
+                self.state["offset"] = len(first)
+            else:
+                first = f.readline()
+                if next(csv.reader([first.decode()]), None) != self.state["header"]:
+                    self._reset()
+                    return self.update()
+            f.seek(self.state["offset"])
+            data = f.read()
+        end = data.rfind(b"\n") + 1  # solo righe complete
+        self.state["offset"] += end
+
+        header = self.state["header"]
+        changed = set()
+        for row in csv.reader(io.StringIO(data[:end].decode())):
+            record = dict(zip(header, row))
+            key = f"{record['N']}|{record['Shuffle_Steps']}"
+            group = self.state["groups"].setdefault(key, {"sums": {}, "counts": {}})
+            for column, value in record.items():
+                try:
+                    number = float(value)
+                except ValueError:
+                    continue  # stati, curve e celle vuote
+                group["sums"][column] = group["sums"].get(column, 0.0) + number
+                group["counts"][column] = group["counts"].get(column, 0) + 1
+            changed.add(int(record["N"]))
+        _write_json(self.state_path, self.state)
+        return changed
+
+    def means(self, N):
+        """{Shuffle_Steps: {colonna: media}} per la dimensione N, ordinato per steps."""
+        out = {}
+        for key, group in self.state["groups"].items():
+            n, steps = key.split("|")
+            if int(n) == N:
+                out[int(steps)] = {column: total / group["counts"][column]
+                                   for column, total in group["sums"].items()}
+        return dict(sorted(out.items()))
+
+    def sizes(self):
+        return sorted({int(key.split("|")[0]) for key in self.state["groups"]})
@@ -0,0 +1,187 @@
+"""
+Cache persistente (SQLite) delle soluzioni ottime, indicizzata dalla board
+in forma canonica rispetto alla simmetria sulla diagonale principale.
+Oltre all'istanza risolta salva anche tutti gli stati intermedi del cammino
+(ogni suffisso di un cammino ottimo è ottimo), con limite LRU sul numero di righe.
+"""
+import re
+import time
+import sqlite3
+
+from homework_main import solve_astar, solve_with_planner, replay_blank_moves
+
+# Trasponendo la griglia: su <-> sinistra, giù <-> destra
+TRANSPOSED_MOVE = {"U": "L", "L": "U", "D": "R", "R": "D"}
+
+
+def transpose_board(board, size):
+    """
+    Simmetria sulla diagonale principale: la casella (r, c) va in (c, r) e le
+    tessere vengono rinominate con la stessa trasformazione applicata alla loro
+    casella goal, così il goal resta il goal (il vuoto in basso a destra è fisso).
+    """
+    n = size * size
+    out = [0] * n
+    for p, val in enumerate(board):
+        r, c = divmod(p, size)
+        if val:
+            gr, gc = divmod(val - 1, size)
+            val = gc * size + gr + 1
+        out[c * size + r] = val
+    return tuple(out)
+
+def canonical_key(board, size):
+    """(chiave, trasposta?) della board: la minore tra board e trasposta."""
+    board = tuple(board)
+    transposed = transpose_board(board, size)
+    if transposed < board:
+        return f"{size}:{bytes(transposed).hex()}", True
+    return f"{size}:{bytes(board).hex()}", False
+
+def path_to_moves(path):
+    """Stringa di mosse del vuoto (U/D/L/R) lungo una lista di stati."""
+    size = path[0].size
+    deltas = {-size: "U", size: "D", -1: "L", 1: "R"}
+    return "".join(deltas[b.empty_pos - a.empty_pos] for a, b in zip(path, path[1:]))
+
+def moves_to_positions(state, moves):
+    """Posizioni successive del vuoto partendo da 'state'."""
+    size = state.size
+    deltas = {"U": -size, "D": size, "L": -1, "R": 1}
+    positions = []
+    empty = state.empty_pos
+    for m in moves:
+        empty += deltas[m]
+        positions.append(empty)
+    return positions
+
+def plan_to_moves(state, plan):
+    """Converte le azioni (slide tile_t pos_r_c pos_r2_c2) del planner in mosse del vuoto."""
+    size = state.size
+    deltas = {-size: "U", size: "D", -1: "L", 1: "R"}
+    empty = state.empty_pos
+    moves = []
+    for action in plan:
+        r, c = map(int, re.findall(r"pos_(\d+)_(\d+)", action)[0])
+        # La tessera parte da (r, c): il vuoto va lì
+        new_empty = r * size + c
+        moves.append(deltas[new_empty - empty])
+        empty = new_empty
+    return "".join(moves)
+
+def moves_to_plan(state, moves):
+    """Azioni nel formato restituito da run_planner_and_parse."""
+    size = state.size
+    board = list(state.board)
+    empty = state.empty_pos
+    plan = []
+    for pos in moves_to_positions(state, moves):
+        tile = board[pos]
+        fr, fc = divmod(pos, size)
+        tr, tc = divmod(empty, size)
+        plan.append(f"slide tile_{tile} pos_{fr}_{fc} pos_{tr}_{tc}")
+        board[empty], board[pos] = tile, 0
+        empty = pos
+    return plan
+
+
+class SolutionCache:
+    """
+    Cache su disco delle soluzioni ottime. Va consultata prima di avviare
+    qualsiasi ricerca: solve() e plan() lo fanno in automatico.
+    """
+    def __init__(self, path="solution_cache.sqlite", max_entries=1_000_000):
+        self.path = path
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS solutions (
+                                 key TEXT PRIMARY KEY,
+                                 length INTEGER NOT NULL,
+                                 moves TEXT NOT NULL,
+                                 last_used REAL NOT NULL)""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON solutions(last_used)")
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, state):
+        """Mosse ottime (stringa U/D/L/R) dallo stato al goal, None se assente."""
+        key, transposed = canonical_key(state.board, state.size)
+        row = self.conn.execute("SELECT moves FROM solutions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.conn.execute("UPDATE solutions SET last_used = ? WHERE key = ?", (time.time(), key))
+        self.conn.commit()
+        moves = row[0]
+        if transposed:
+            moves = "".join(TRANSPOSED_MOVE[m] for m in moves)
+        return moves
+
+    def store(self, path):
+        """Salva un cammino ottimo (lista di stati) e tutti i suoi suffissi."""
+        moves = path_to_moves(path)
+        now = time.time()
+        rows = []
+        for i, state in enumerate(path):
+            suffix = moves[i:]
+            key, transposed = canonical_key(state.board, state.size)
+            if transposed:
+                suffix = "".join(TRANSPOSED_MOVE[m] for m in suffix)
+            rows.append((key, len(suffix), suffix, now))
+        self.conn.executemany("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?)", rows)
+        self._evict()
+        self.conn.commit()
+
+    def _evict(self):
+        count = self.conn.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+        if count > self.max_entries:
+            self.conn.execute("""DELETE FROM solutions WHERE key IN (
+                                     SELECT key FROM solutions ORDER BY last_used LIMIT ?)""",
+                              (count - self.max_entries,))
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    def solve(self, state, solver=solve_astar, **kwargs):
+        """
+        Come solver(state, **kwargs), ma risponde subito se lo stato è in cache.
+        Il solver deve essere ottimo (A*, IDA*, bidirezionale...).
+        """
+        start_time = time.time()
+        moves = self.lookup(state)
+        if moves is not None:
+            return {
+                "status": "success",
+                "path": replay_blank_moves(state, moves_to_positions(state, moves)),
+                "nodes_expanded": 0,
+                "time": time.time() - start_time,
+                "cached": True
+            }
+        res = solver(state, **kwargs)
+        if res["status"] == "success":
+            self.store(res["path"])
+        return res
+
+    def plan(self, state, planner_path="fast-downward.py", timeout=None):
+        """Come solve_with_planner, con la stessa cache (il planner usa astar(lmcut()), ottimo)."""
+        start_time = time.time()
+        moves = self.lookup(state)
+        if moves is not None:
+            return {
+                "status": "success",
+                "plan_length": len(moves),
+                "plan": moves_to_plan(state, moves),
+                "time": time.time() - start_time,
+                "expanded_nodes": 0,
+                "cached": True
+            }
+        res = solve_with_planner(state, planner_path=planner_path, timeout=timeout)
+        if res["status"] == "success":
+            moves = plan_to_moves(state, res["plan"])
+            self.store(replay_blank_moves(state, moves_to_positions(state, moves)))
+        return res
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,402 @@
+"""
+Rilevamento dei duplicati a memoria limitata per le ricerche in profondità:
+
+- TranspositionTable: tabella di dimensione fissa (indirizzamento aperto su
+  array) con chiave lo hash di Zobrist della board, aggiornato in O(1) a ogni
+  mossa. Per ogni stato conserva il g migliore visto nell'iterazione corrente
+  (identificata dal suo bound) e taglia le visite successive con g >= di quello.
+  Con symmetry=True la chiave è la minore tra quella della board e quella della
+  sua trasposta con tessere rinominate (transpose_board di solution_cache, che
+  lascia fisso il goal): uno stato e il suo speculare, alla stessa distanza dal
+  goal, condividono lo slot. Anche la seconda chiave si aggiorna in O(1).
+- MoveFSM: automa a stati finiti sulle mosse del vuoto (Taylor & Korf) che
+  rifiuta le sequenze con un equivalente più corto o precedente in ordine
+  (es. i cicli brevi), costruito una volta su una griglia illimitata.
+
+Entrambi preservano l'ottimalità di IDA* se i figli vengono visitati
+nell'ordine delle mosse su, giù, sinistra, destra (quello di move_table):
+il cammino ottimo minimo in ordine lessicografico non viene mai tagliato.
+Vale anche per la chiave simmetrica: se lo speculare di un suo nodo è stato
+visitato prima con g non maggiore, seguire da lì le mosse trasposte darebbe un
+cammino ottimo ancora precedente.
+"""
+import math
+import time
+import random
+from array import array
+
+from homework_main import (heuristic_manhattan, manhattan_table, move_table, goal_board, replay_blank_moves,
+                           resolve_heuristic, _BoardView, _SearchTimeout, TIMEOUT_CHECK_INTERVAL)
+
+# Spostamenti del vuoto (riga, colonna) in ordine di codice: su, giù, sinistra, destra
+DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+MOVE_NAMES = "UDLR"
+
+# Lunghezza massima delle sequenze esaminate per costruire l'automa
+DEFAULT_FSM_DEPTH = 10
+
+# Bit di indice della tabella (2^bits slot, 12 byte l'uno)
+DEFAULT_TT_BITS = 20
+
+
+# --- Hash di Zobrist ---
+
+_ZOBRIST = {}
+
+def zobrist_keys(size, seed=0x5EED):
+    """keys[tessera][posizione]: interi casuali a 64 bit (0 per il vuoto)."""
+    keys = _ZOBRIST.get(size)
+    if keys is None:
+        rng = random.Random(seed + size)
+        n = size * size
+        keys = [[0] * n] + [[rng.getrandbits(64) for _ in range(n)] for _ in range(1, n)]
+        _ZOBRIST[size] = keys
+    return keys
+
+def zobrist_hash(board, size, keys=None):
+    keys = keys or zobrist_keys(size)
+    h = 0
+    for pos, tile in enumerate(board):
+        h ^= keys[tile][pos]
+    return h
+
+_TRANSPOSED_ZOBRIST = {}
+
+def transposed_zobrist_keys(size):
+    """
+    keys[tessera][posizione] = chiave che la tessera avrebbe nella board
+    trasposta: posizione (r, c) -> (c, r), tessera con goal (r, c) -> quella
+    con goal (c, r). zobrist_hash(board, size, keys) è quindi lo hash di
+    transpose_board(board, size), aggiornabile mossa per mossa come l'altro.
+    """
+    keys = _TRANSPOSED_ZOBRIST.get(size)
+    if keys is None:
+        base = zobrist_keys(size)
+        n = size * size
+        flip = [(p % size) * size + p // size for p in range(n)]
+        keys = [[0] * n] + [[base[flip[tile - 1] + 1][flip[pos]] for pos in range(n)] for tile in range(1, n)]
+        _TRANSPOSED_ZOBRIST[size] = keys
+    return keys
+
+
+# --- Tabella delle trasposizioni ---
+
+class TranspositionTable:
+    """
+    Tabella a dimensione fissa: per slot chiave Zobrist (64 bit), g (16 bit)
+    e bound dell'iterazione in cui è stato scritto (16 bit, 0 = vuoto; gli
+    slot di iterazioni precedenti contano come liberi). Ogni chiave può stare
+    in PROBES slot consecutivi; se sono tutti occupati si sostituisce quello
+    con g maggiore, che protegge il sottoalbero più piccolo.
+    """
+    PROBES = 4
+
+    def __init__(self, bits=DEFAULT_TT_BITS):
+        self.bits = bits
+        self.capacity = 1 << bits
+        self.keys = array("Q", bytes(8 * self.capacity))
+        self.g = array("H", bytes(2 * self.capacity))
+        self.stamp = array("H", bytes(2 * self.capacity))
+        self.hits = 0
+        self.replacements = 0
+
+    def visit(self, key, g, bound):
+        """
+        Registra la visita dello stato 'key' con costo g durante l'iterazione
+        'bound'. Restituisce True se lo stato è già stato visitato in questa
+        iterazione con g minore o uguale (il nodo si può tagliare).
+        """
+        stamp = bound + 1
+        mask = self.capacity - 1
+        base = key >> (64 - self.bits)
+        keys, gs, stamps = self.keys, self.g, self.stamp
+        victim = -1
+        victim_g = -1
+        for i in range(self.PROBES):
+            slot = (base + i) & mask
+            if stamps[slot] == stamp:
+                if keys[slot] == key:
+                    if gs[slot] <= g:
+                        self.hits += 1
+                        return True
+                    gs[slot] = g
+                    return False
+                if victim_g != math.inf and gs[slot] > victim_g:
+                    victim, victim_g = slot, gs[slot]
+            elif victim_g != math.inf:
+                victim, victim_g = slot, math.inf  # primo slot libero
+        if victim >= 0 and victim_g > g:
+            if victim_g != math.inf:
+                self.replacements += 1
+            keys[victim] = key
+            gs[victim] = g
+            stamps[victim] = stamp
+        return False
+
+    def memory_bytes(self):
+        return 12 * self.capacity
+
+
+# --- Automa delle mosse ---
+
+def find_forbidden_sequences(max_len=DEFAULT_FSM_DEPTH):
+    """
+    Visita in ampiezza (in ordine di lunghezza e poi di codice delle mosse)
+    delle sequenze di mosse del vuoto su una griglia illimitata. Lo stato di
+    una sequenza è la permutazione delle caselle toccate: una sequenza che
+    porta nello stesso stato di una precedente, la quale usa solo caselle già
+    toccate da lei (quindi è applicabile ovunque lo sia lei), è vietata.
+    Restituisce l'insieme minimo delle sequenze vietate (stringhe di UDLR).
+    """
+    origin = (0, 0)
+    forbidden = set()
+    seen = {frozenset(): [frozenset([origin])]}
+    frontier = [("", {}, origin, frozenset([origin]))]
+    for _ in range(max_len):
+        next_frontier = []
+        for seq, occupant, blank, visited in frontier:
+            for code, (dr, dc) in enumerate(DIRECTIONS):
+                new_seq = seq + MOVE_NAMES[code]
+                # Contiene già una sequenza vietata (come suffisso, dato che seq è valida)
+                if any(new_seq[i:] in forbidden for i in range(1, len(new_seq))):
+                    continue
+                target = (blank[0] + dr, blank[1] + dc)
+                # occupant[casella] = casella di partenza del contenuto (solo se diversa)
+                moved = dict(occupant)
+                moved[blank] = occupant.get(target, target)
+                moved[target] = origin
+                moved = {cell: src for cell, src in moved.items() if cell != src}
+                state = frozenset(moved.items())
+                new_visited = visited | {target}
+                earlier = seen.get(state)
+                if earlier and any(cells <= new_visited for cells in earlier):
+                    forbidden.add(new_seq)
+                    continue
+                seen.setdefault(state, []).append(new_visited)
+                next_frontier.append((new_seq, moved, target, new_visited))
+        frontier = next_frontier
+    return forbidden
+
+
+class MoveFSM:
+    """
+    Automa di Aho-Corasick sulle sequenze vietate: next[stato][mossa] è lo
+    stato successivo, -1 se la mossa completa una sequenza vietata.
+    Comprende il divieto di annullare la mossa appena fatta (UD, DU, LR, RL).
+    """
+    def __init__(self, max_len=DEFAULT_FSM_DEPTH):
+        start = time.time()
+        self.max_len = max_len
+        self.forbidden = find_forbidden_sequences(max_len)
+
+        # Trie delle sequenze vietate
+        children = [[-1] * 4]
+        terminal = [False]
+        for seq in self.forbidden:
+            node = 0
+            for name in seq:
+                code = MOVE_NAMES.index(name)
+                if children[node][code] < 0:
+                    children[node][code] = len(children)
+                    children.append([-1] * 4)
+                    terminal.append(False)
+                node = children[node][code]
+            terminal[node] = True
+
+        # Collegamenti di fallimento in ampiezza e tabella delle transizioni completa
+        fail = [0] * len(children)
+        transitions = [[0] * 4 for _ in children]
+        queue = [0]
+        for node in queue:
+            for code in range(4):
+                child = children[node][code]
+                if child >= 0:
+                    fail[child] = transitions[fail[node]][code] if node else 0
+                    terminal[child] = terminal[child] or terminal[fail[child]]
+                    transitions[node][code] = child
+                    queue.append(child)
+                else:
+                    transitions[node][code] = transitions[fail[node]][code] if node else 0
+        self.next = [tuple(-1 if terminal[t] else t for t in row) for row in transitions]
+        self.build_time = time.time() - start
+
+    def __len__(self):
+        return len(self.next)
+
+    def accepts(self, moves):
+        """True se la sequenza (stringa di UDLR) non contiene sequenze vietate."""
+        state = 0
+        for name in moves:
+            state = self.next[state][MOVE_NAMES.index(name)]
+            if state < 0:
+                return False
+        return True
+
+
+_FSMS = {}
+
+def move_fsm(max_len=DEFAULT_FSM_DEPTH):
+    """Automa delle mosse (costruito una volta per profondità)."""
+    fsm = _FSMS.get(max_len)
+    if fsm is None:
+        fsm = _FSMS[max_len] = MoveFSM(max_len)
+    return fsm
+
+
+# --- IDA* con potatura dei duplicati ---
+
+def solve_idastar_pruned(start_state, timeout=60, heuristic=None, fsm=True, tt_bits=DEFAULT_TT_BITS,
+                         symmetry=False):
+    """
+    IDA* come solve_idastar, con l'automa delle mosse (fsm=True, oppure un
+    MoveFSM) al posto del solo divieto di tornare indietro e, se tt_bits > 0,
+    una TranspositionTable di 2^tt_bits slot (con symmetry=True indicizzata
+    anche per trasposizione). Restituisce il dizionario di solve_astar con in
+    più "nodes_generated", "tt_hits" e "tt_bytes". Lo hash di Zobrist si
+    aggiorna solo se c'è la tabella (un aggiornamento per mossa, due con
+    symmetry=True): senza tabella la ricerca non paga nulla per le chiavi.
+    La chiave simmetrica è facoltativa: sui random walk di 4x4 e 5x5 taglia
+    pochissimi nodi in più (gli speculari raramente cadono nella stessa
+    iterazione) e costa il secondo aggiornamento.
+    """
+    size = start_state.size
+    board = list(start_state.board)
+    view = _BoardView(board, size)
+    heuristic = resolve_heuristic(heuristic, size)
+    goal = list(goal_board(size))
+    dist = manhattan_table(size)
+    moves = move_table(size)
+    zobrist = zobrist_keys(size)
+    transposed = transposed_zobrist_keys(size) if symmetry else None
+    # Codice di ogni mossa (da, a), nello stesso ordine usato dall'automa
+    codes = {(-size): 0, size: 1, -1: 2, 1: 3}
+    if fsm is True:
+        fsm = move_fsm()
+    fsm_next = fsm.next if fsm else None
+    table = TranspositionTable(tt_bits) if tt_bits else None
+
+    path = [start_state.empty_pos]
+    nodes_expanded = 0
+    nodes_generated = 0
+    start_time = time.time()
+    found = -1
+
+    def search(g, h, bound, empty, parent, state):
+        """Ricerca senza tabella: nessuno hash da aggiornare."""
+        nonlocal nodes_expanded, nodes_generated
+        f = g + h
+        if f > bound:
+            return f
+        if h == 0 and board == goal:
+            return found
+
+        nodes_expanded += 1
+        if nodes_expanded % TIMEOUT_CHECK_INTERVAL == 0 and time.time() - start_time > timeout:
+            raise _SearchTimeout()
+
+        minimum = math.inf
+        for new_pos in moves[empty]:
+            if fsm_next is not None:
+                new_state = fsm_next[state][codes[new_pos - empty]]
+                if new_state < 0:
+                    continue
+            elif new_pos == parent:
+                continue
+            else:
+                new_state = 0
+            nodes_generated += 1
+            tile = board[new_pos]
+            board[empty], board[new_pos] = tile, 0
+            if heuristic is None:
+                new_h = h - dist[tile][new_pos] + dist[tile][empty]
+            else:
+                new_h = heuristic(view)
+            path.append(new_pos)
+
+            t = search(g + 1, new_h, bound, new_pos, empty, new_state)
+            if t == found:
+                return found
+
+            path.pop()
+            board[empty], board[new_pos] = 0, tile
+            if t < minimum:
+                minimum = t
+        return minimum
+
+    def search_tt(g, h, bound, empty, parent, state, key, tkey):
+        """Come search, con la tabella; tkey si aggiorna solo con symmetry=True."""
+        nonlocal nodes_expanded, nodes_generated
+        f = g + h
+        if f > bound:
+            return f
+        if h == 0 and board == goal:
+            return found
+        if table.visit(min(key, tkey) if symmetry else key, g, bound):
+            return math.inf  # già visitato (o il suo speculare) in questa iterazione con g non peggiore
+
+        nodes_expanded += 1
+        if nodes_expanded % TIMEOUT_CHECK_INTERVAL == 0 and time.time() - start_time > timeout:
+            raise _SearchTimeout()
+
+        minimum = math.inf
+        for new_pos in moves[empty]:
+            if fsm_next is not None:
+                new_state = fsm_next[state][codes[new_pos - empty]]
+                if new_state < 0:
+                    continue
+            elif new_pos == parent:
+                continue
+            else:
+                new_state = 0
+            nodes_generated += 1
+            tile = board[new_pos]
+            board[empty], board[new_pos] = tile, 0
+            if heuristic is None:
+                new_h = h - dist[tile][new_pos] + dist[tile][empty]
+            else:
+                new_h = heuristic(view)
+            path.append(new_pos)
+
+            t = search_tt(g + 1, new_h, bound, new_pos, empty, new_state,
+                          key ^ zobrist[tile][new_pos] ^ zobrist[tile][empty],
+                          tkey ^ transposed[tile][new_pos] ^ transposed[tile][empty] if symmetry else 0)
+            if t == found:
+                return found
+
+            path.pop()
+            board[empty], board[new_pos] = 0, tile
+            if t < minimum:
+                minimum = t
+        return minimum
+
+    def finish(result):
+        result.update({"nodes_generated": nodes_generated,
+                       "tt_hits": table.hits if table is not None else 0,
+                       "tt_bytes": table.memory_bytes() if table is not None else 0})
+        return result
+
+    start_h = heuristic_manhattan(start_state) if heuristic is None else heuristic(view)
+    if table is not None:
+        start_key = zobrist_hash(board, size, zobrist)
+        start_tkey = zobrist_hash(board, size, transposed) if symmetry else 0
+    bound = start_h
+    try:
+        while True:
+            if table is None:
+                t = search(0, start_h, bound, start_state.empty_pos, None, 0)
+            else:
+                t = search_tt(0, start_h, bound, start_state.empty_pos, None, 0, start_key, start_tkey)
+            if t == found:
+                break
+            if t == math.inf:
+                return finish({"status": "failure"})
+            bound = t
+    except _SearchTimeout:
+        return finish({"status": "timeout", "time": timeout, "nodes_expanded": nodes_expanded})
+
+    return finish({
+        "status": "success",
+        "path": replay_blank_moves(start_state, path[1:]),
+        "nodes_expanded": nodes_expanded,
+        "time": time.time() - start_time
+    })